@@ -1,4 +1,4 @@
-from typing import Optional, Literal, NamedTuple
+from typing import Optional, Literal, NamedTuple, Callable, Any
 from dataclasses import dataclass
 from pathlib import Path
 import traceback
@@ -8,13 +8,14 @@ import re
 
 from modules.logger import Logger
 from modules.interfaces.roblox import RobloxInterface
-from modules.interfaces.config import ConfigInterface
-from modules.networking import requests, Response, Api
+from modules.interfaces.config import ConfigInterface, ConfigSnapshot
+from modules.networking import Api
 
-from .client import RichPresenceClient, DiscordNotFound, PipeClosed, RichPresenceStatus, RichPresenceButton
+from .client import Presence, RichPresenceClient, DiscordNotFound, PipeClosed, RichPresenceStatus, RichPresenceButton
 from .reader import LogReader, LogEntry
 from .data import Data
 from .bloxstrap_rpc_data import BloxstrapRPCData, BloxstrapRPCImage
+from .resolver import MetadataResolver, ResolvedMetadata, AssetThumbnailResolver
 
 
 class Config(NamedTuple):
@@ -28,11 +29,14 @@ class GameData:
     timestamp: int | None = None
     server_id: str | None = None
     place_id: str | None = None
+    universe_id: str | None = None
     root_place_id: str | None = None
     user_id: str | None = None
     name: str | None = None
     creator: str | None = None
     thumbnail: str | None = None
+    user_name: str | None = None
+    user_thumbnail: str | None = None
     bloxstrap_rpc: BloxstrapRPCData | None = None
     studio_local_file: bool = False
     studio_local_filename: str = ""
@@ -46,10 +50,27 @@ class ActivityWatcher:
 
     _data: GameData
     _last_data: GameData | None = None
+    _new_settings: ConfigSnapshot | None = None  # Set by the config callback, handled by the mainloop
+    _resolver: MetadataResolver
+    _resolved: list[tuple[GameData, ResolvedMetadata]]  # Appended to by the resolver, handled by the mainloop
+    _images: AssetThumbnailResolver
+    _images_resolved: bool = False  # Set by the image resolver, handled by the mainloop
+    _config_source: Any
+    _roblox: Any
+    _log_reader: Callable[..., LogReader]
+    _presence: Callable[[str], Any]
 
     _LOG_PREFIX: str = "ActivityWatcher"
     _COOLDOWN_MS: int = 250
-    _CONFIG_UPDATE_INTERVAL_LOOPS: int = 4  # Every _COOLDOWN_MS * _CONFIG_UPDATE_INTERVAL_LOOPS ms
+
+
+    def __init__(self, config_source: Any = ConfigInterface, roblox: Any = RobloxInterface, log_reader: Callable[..., LogReader] = LogReader, presence: Callable[[str], Any] = Presence) -> None:
+        """The defaults can be replaced to run without Roblox or Discord, see replay.py"""
+
+        self._config_source = config_source
+        self._roblox = roblox
+        self._log_reader = log_reader
+        self._presence = presence
 
 
     def run(self, mode: Optional[Literal["Player", "Studio"]] = None) -> None:
@@ -60,45 +81,53 @@ class ActivityWatcher:
         self.mode = mode
         Logger.info(f"RPC mode: {mode}", prefix=self._LOG_PREFIX)
 
-        if not RobloxInterface.is_roblox_running(mode):
+        if not self._roblox.is_roblox_running(mode):
             self._wait_until_running()
 
-        rpc_enabled: bool = ConfigInterface.get("discord_rpc")
-        if not rpc_enabled:
+        settings: ConfigSnapshot = self._config_source.snapshot()
+        if not settings.discord_rpc:
             Logger.warning("Discord RPC disabled!")
             return
-        activity_joining: bool = ConfigInterface.get("activity_joining")
-        show_user_in_rpc: bool = ConfigInterface.get("show_user_in_rpc")
-        bloxstrap_rpc_sdk: bool = ConfigInterface.get("bloxstrap_rpc_sdk")
-        self.config = Config(bloxstrap_rpc=bloxstrap_rpc_sdk, activity_joining=activity_joining, show_user_profile=show_user_in_rpc)
+        self.config = Config(bloxstrap_rpc=settings.bloxstrap_rpc_sdk, activity_joining=settings.activity_joining, show_user_profile=settings.show_user_in_rpc)
 
+        config_callback_id: str = self._config_source.add_callback(self._on_config_change)
+        self._resolved = []
+        self._resolver = MetadataResolver(self._on_metadata_resolved)
+        self._images = AssetThumbnailResolver(self._on_images_resolved)
         try:
             self.timestamp = int(time.time())
             cooldown: float = self._COOLDOWN_MS / 1000
-            self.reader = LogReader(mode)
+            self.reader = self._log_reader(mode, markers=self._get_markers())
 
-            with RichPresenceClient(mode) as client:
+            with RichPresenceClient(mode, presence=self._presence) as client:
                 client.set_default_status(self.timestamp)
-                loop_counter: int = 0
-                while RobloxInterface.is_roblox_running(self.mode):  # mainloop
-                    loop_counter += 1
+                while self._roblox.is_roblox_running(self.mode):  # mainloop
                     forced_update: bool = False
-                    if loop_counter % self._CONFIG_UPDATE_INTERVAL_LOOPS == 0:
-                        rpc_enabled: bool = ConfigInterface.get("discord_rpc")
-                        if not rpc_enabled:
+                    new_settings: ConfigSnapshot | None = self._new_settings
+                    if new_settings is not None:
+                        self._new_settings = None
+                        if not new_settings.discord_rpc:
                             Logger.warning("Discord RPC disabled!")
                             return
-                        activity_joining = ConfigInterface.get("activity_joining")
-                        show_user_in_rpc = ConfigInterface.get("show_user_in_rpc")
-                        bloxstrap_rpc_sdk = ConfigInterface.get("bloxstrap_rpc_sdk")
-                        new_config: Config = Config(bloxstrap_rpc=bloxstrap_rpc_sdk, activity_joining=activity_joining, show_user_profile=show_user_in_rpc)
-                        if new_config != (self.config):
-                            self.config = Config(bloxstrap_rpc=bloxstrap_rpc_sdk, activity_joining=activity_joining, show_user_profile=show_user_in_rpc)
+                        new_config: Config = Config(bloxstrap_rpc=new_settings.bloxstrap_rpc_sdk, activity_joining=new_settings.activity_joining, show_user_profile=new_settings.show_user_in_rpc)
+                        if new_config != self.config:
+                            self.config = new_config
                             forced_update = True
 
+                    while self._resolved:
+                        resolved_data, metadata = self._resolved.pop(0)
+                        if resolved_data is not self._data: continue  # Left that game in the meantime
+                        self._apply_metadata(resolved_data, metadata)
+                        if resolved_data is self._last_data: forced_update = True
+
+                    if self._images_resolved:
+                        self._images_resolved = False
+                        if self._last_data is not None and self._last_data.bloxstrap_rpc is not None: forced_update = True
+
+                    client.flush()  # Sends a status that was held back by the rate limit
                     entries: list[LogEntry] = self.reader.read_new()
                     if not entries and not forced_update:
-                        time.sleep(cooldown)
+                        self.reader.wait(cooldown)  # Returns as soon as the log grows
                         continue
 
                     if entries and self._is_exit_message(entries[-1]):
@@ -106,26 +135,29 @@ class ActivityWatcher:
 
                     result: Literal["update", "default"] | None = self._process_entries(entries)
                     if result == "default":
+                        self._last_data = None
                         client.set_default_status(self.timestamp)
 
                     elif result == "update" or forced_update:
-                        if not forced_update:
+                        if result == "update":
                             self._last_data = self._data
 
                         if self._last_data is None:
-                            time.sleep(cooldown)
+                            self.reader.wait(cooldown)
                             continue
 
                         game_data: GameData = self._last_data
                         start: Optional[int] = game_data.timestamp
                         end: Optional[int] = None
-                        state: Optional[str] = f"By {game_data.creator}"
-                        details: Optional[str] = f"Editing {game_data.name}" if self.mode == "Studio" else f"Playing {game_data.name}"
-                        large_image: Optional[str] = game_data.thumbnail
+                        # Metadata may still be resolving, the presence is updated again once it arrives
+                        state: Optional[str] = f"By {game_data.creator}" if game_data.creator else None
+                        details: Optional[str] = f"Editing {game_data.name or "a place"}" if self.mode == "Studio" else f"Playing {game_data.name or "a game"}"
+                        large_image: Optional[str] = game_data.thumbnail or client.logo_asset_key
                         large_text: Optional[str] = game_data.name
                         small_image: Optional[str] = client.logo_asset_key
                         small_text: Optional[str] = "Roblox Studio" if self.mode == "Studio" else "Roblox"
-                        buttons: Optional[list[RichPresenceButton]] = [RichPresenceButton("View on Roblox", Api.Roblox.Activity.page(game_data.root_place_id))]
+                        root_place_id: Optional[str] = game_data.root_place_id or game_data.place_id
+                        buttons: Optional[list[RichPresenceButton]] = [RichPresenceButton("View on Roblox", Api.Roblox.Activity.page(root_place_id))] if root_place_id else []
 
                         if game_data.studio_local_file:
                             details = f"Editing {game_data.studio_local_filename}"
@@ -138,15 +170,9 @@ class ActivityWatcher:
                         if self.mode == "Player" and self.config.activity_joining:
                             buttons.insert(0, RichPresenceButton("Join Server", Api.Roblox.Activity.deeplink(game_data.place_id, game_data.server_id)))
 
-                        if self.mode == "Player" and self.config.show_user_profile and game_data.user_id is not None:
-                            response: Response = requests.get(Api.Roblox.Activity.user(game_data.user_id))
-                            data: dict = response.json()
-                            small_text: str = data.get("displayName", data["name"])
-
-                            response = requests.get(Api.Roblox.Activity.user_thumbnail(game_data.user_id))
-                            data = response.json()
-                            actual_data: dict = data["data"][0]
-                            small_image: str = actual_data["imageUrl"]
+                        if self.mode == "Player" and self.config.show_user_profile:
+                            if game_data.user_name: small_text = game_data.user_name
+                            if game_data.user_thumbnail: small_image = game_data.user_thumbnail
 
                         if self.config.bloxstrap_rpc and game_data.bloxstrap_rpc is not None:
                             if game_data.bloxstrap_rpc.start is not None: start = game_data.bloxstrap_rpc.start
@@ -158,16 +184,16 @@ class ActivityWatcher:
                                     small_image = None
                                     small_text = None
                                 else:
-                                    if game_data.bloxstrap_rpc.small_image.source:
-                                        small_image = game_data.bloxstrap_rpc.small_image.source
+                                    source: Optional[str] = self._images.get(game_data.bloxstrap_rpc.small_image.asset_id) if game_data.bloxstrap_rpc.small_image.asset_id else None
+                                    if source: small_image = source
                                     small_text = game_data.bloxstrap_rpc.small_image.hover_text
                             if game_data.bloxstrap_rpc.large_image is not None and not game_data.bloxstrap_rpc.large_image.reset:
                                 if game_data.bloxstrap_rpc.large_image.clear:
                                     large_image = None
                                     large_text = None
                                 else:
-                                    if game_data.bloxstrap_rpc.large_image.source:
-                                        large_image = game_data.bloxstrap_rpc.large_image.source
+                                    source: Optional[str] = self._images.get(game_data.bloxstrap_rpc.large_image.asset_id) if game_data.bloxstrap_rpc.large_image.asset_id else None
+                                    if source: large_image = source
                                     large_text = game_data.bloxstrap_rpc.large_image.hover_text
 
                         status = RichPresenceStatus(
@@ -179,7 +205,7 @@ class ActivityWatcher:
                         )
                         client.update(status)
 
-                    time.sleep(cooldown)
+                    self.reader.wait(cooldown)
 
         except DiscordNotFound:
             Logger.warning("Discord not found!", prefix=self._LOG_PREFIX)
@@ -194,14 +220,43 @@ class ActivityWatcher:
         else:
             Logger.info("Exiting Activity Watcher!", prefix=self._LOG_PREFIX)
 
+        finally:
+            self._config_source.remove_callback(config_callback_id)
+            self._resolver.close()
+            self._images.close()
+            reader: LogReader | None = getattr(self, "reader", None)
+            if reader is not None: reader.close()
+
+
+    def _on_config_change(self, settings: ConfigSnapshot) -> None:
+        self._new_settings = settings
+
+
+    def _on_metadata_resolved(self, game_data: GameData, metadata: ResolvedMetadata) -> None:
+        self._resolved.append((game_data, metadata))
+
+
+    def _on_images_resolved(self) -> None:
+        self._images_resolved = True
+
+
+    def _apply_metadata(self, game_data: GameData, metadata: ResolvedMetadata) -> None:
+        if metadata.universe_id is not None: game_data.universe_id = metadata.universe_id
+        if metadata.root_place_id is not None: game_data.root_place_id = metadata.root_place_id
+        if metadata.name is not None: game_data.name = metadata.name
+        if metadata.creator is not None: game_data.creator = metadata.creator
+        if metadata.thumbnail: game_data.thumbnail = metadata.thumbnail
+        if metadata.user_name is not None: game_data.user_name = metadata.user_name
+        if metadata.user_thumbnail: game_data.user_thumbnail = metadata.user_thumbnail
+
 
     def _auto_detect_mode(self, attempts: int = 3, cooldown_ms: int = 500) -> Literal["Player", "Studio"]:
         Logger.info("Auto-detecting RPC mode...", prefix=self._LOG_PREFIX)
         cooldown: float = cooldown_ms / 1000
         for _ in range(attempts):
-            if RobloxInterface.is_roblox_running("Player"):
+            if self._roblox.is_roblox_running("Player"):
                 return "Player"
-            elif RobloxInterface.is_roblox_running("Studio"):
+            elif self._roblox.is_roblox_running("Studio"):
                 return "Studio"
             time.sleep(cooldown)
 
@@ -214,7 +269,7 @@ class ActivityWatcher:
 
         cooldown: float = cooldown_ms / 1000
         for _ in range(attempts):
-            if RobloxInterface.is_roblox_running(self.mode):
+            if self._roblox.is_roblox_running(self.mode):
                 Logger.info("Roblox launch detected!", prefix=self._LOG_PREFIX)
                 return
             time.sleep(cooldown)
@@ -229,8 +284,17 @@ class ActivityWatcher:
             case "Studio": return entry.prefix == Data.Studio.Exit.prefix and entry.message == Data.Studio.Exit.message
 
 
+    def _get_markers(self) -> tuple[str, ...]:
+        """Every line handled by _is_exit_message and _process_entries contains one of these"""
+
+        match self.mode:
+            case "Player": return (Data.Player.GameID.startswith, Data.Player.Join.startswith, Data.BloxstrapRPC.startswith, Data.Player.Exit.message)
+            case "Studio": return (Data.Studio.Join.startswith, Data.Studio.Leave.message, Data.BloxstrapRPC.startswith, Data.Studio.Exit.message)
+
+
     def _process_entries(self, entries: list[LogEntry]) -> Literal["update", "default"] | None:
         return_value: Literal["update", "default"] | None = None
+        latest_rpc: LogEntry | None = None  # Each BloxstrapRPC message replaces the previous one, so only the last one is processed
 
         match self.mode:
             case "Player":
@@ -239,33 +303,21 @@ class ActivityWatcher:
                         split_message: list[str] = entry.message.removeprefix(Data.Player.GameID.startswith).split()
                         server_id: str = split_message[0].strip("'")
                         self._data = GameData(timestamp=int(entry.timestamp), server_id=server_id)
+                        latest_rpc = None
 
                     elif entry.prefix == Data.Player.Join.prefix and entry.message.startswith(Data.Player.Join.startswith):
                         pattern = r"placeid:(\d+).*?universeid:(\d+).*?userid:(\d+)"
                         match = re.search(pattern, entry.message)
                         if match:
                             self._data.place_id = match.group(1)
-                            universe_id = match.group(2)
+                            self._data.universe_id = match.group(2)
                             self._data.user_id = match.group(3)
-
-                            response: Response = requests.get(Api.Roblox.Activity.game(universe_id))
-                            data: dict = response.json()
-                            actual_data: dict = data["data"][0]
-                            self._data.root_place_id = actual_data["rootPlaceId"]
-                            self._data.name = actual_data["name"]
-                            self._data.creator = actual_data["creator"]["name"]
-
-                            response = requests.get(Api.Roblox.Activity.thumbnail(universe_id))
-                            data = response.json()
-                            actual_data: dict = data["data"][0]
-                            self._data.thumbnail = actual_data["imageUrl"]
-
+                            self._resolver.submit(self._data, universe_id=self._data.universe_id, user_id=self._data.user_id)
                             return_value = "update"
 
 
                     elif entry.prefix == Data.BloxstrapRPC.prefix and entry.message.startswith(Data.BloxstrapRPC.startswith):
-                        if self._process_bloxstrap_rpc(entry):
-                            return_value = "update"
+                        latest_rpc = entry
 
 
             case "Studio":
@@ -274,40 +326,32 @@ class ActivityWatcher:
                         identifier: str = entry.message.removeprefix(Data.Studio.Join.startswith).removesuffix(Data.Studio.Join.endswith).strip()
 
                         self._data = GameData(timestamp=entry.timestamp)
+                        latest_rpc = None
 
                         if not identifier.isdigit():
                             self._data.studio_local_file = True
                             self._data.studio_local_filename = Path(identifier).name
 
                         else:
-                            place_id = identifier
-                            response = requests.get(Api.Roblox.Activity.universe_id(place_id))
-                            data = response.json()
-                            universe_id = data["universeId"]
-
-                            response: Response = requests.get(Api.Roblox.Activity.game(universe_id))
-                            data: dict = response.json()
-                            actual_data: dict = data["data"][0]
-                            self._data.root_place_id = actual_data["rootPlaceId"]
-                            self._data.name = actual_data["name"]
-                            self._data.creator = actual_data["creator"]["name"]
-
-                            response = requests.get(Api.Roblox.Activity.thumbnail(universe_id))
-                            data = response.json()
-                            actual_data: dict = data["data"][0]
-                            self._data.thumbnail = actual_data["imageUrl"]
+                            self._data.place_id = identifier
+                            self._resolver.submit(self._data, place_id=identifier)
 
                         return_value = "update"
 
 
                     elif entry.prefix == Data.BloxstrapRPC.prefix and entry.message.startswith(Data.BloxstrapRPC.startswith):
-                        if self._process_bloxstrap_rpc(entry):
-                            return_value = "update"
+                        latest_rpc = entry
 
 
                     elif entry.prefix == Data.Studio.Leave.prefix and entry.message == Data.Studio.Leave.message:
+                        if latest_rpc is not None:
+                            self._process_bloxstrap_rpc(latest_rpc)
+                            latest_rpc = None
+                        self._data = GameData()  # Metadata that is still resolving for the place that was left gets dropped
                         return_value = "default"
 
+        if latest_rpc is not None and self._process_bloxstrap_rpc(latest_rpc):
+            return_value = "update"
         return return_value
 
 
@@ -357,7 +401,7 @@ class ActivityWatcher:
         return True
 
 
-    def _process_bloxstrap_rpc_image(self, data: dict, circular: bool = False) -> BloxstrapRPCImage | None:
+    def _process_bloxstrap_rpc_image(self, data: dict) -> BloxstrapRPCImage | None:
         asset_id: Optional[str] = data.get("assetId")
         try:
             asset_id = str(int(asset_id))
@@ -371,12 +415,5 @@ class ActivityWatcher:
         if not isinstance(clear, bool): clear = False
         reset = data.get("reset")
         if not isinstance(reset, bool): reset = False
-        source = None
-        try:
-            response = requests.get(Api.Roblox.Activity.asset_thumbnail(asset_id, circular=circular))
-            data = response.json()
-            actual_data: dict = data["data"][0]
-            source = actual_data["imageUrl"]
-        except Exception as e:
-            Logger.warning(f"Failed to load BloxstrapRPC image! {type(e).__name__}: {e}")
-        return BloxstrapRPCImage(source=source, hover_text=hover_text, clear=clear, reset=reset)
\ No newline at end of file
+        self._images.get(asset_id)  # Start the lookup early, it's usually done by the time the presence is updated
+        return BloxstrapRPCImage(asset_id=asset_id, hover_text=hover_text, clear=clear, reset=reset)
\ No newline at end of file
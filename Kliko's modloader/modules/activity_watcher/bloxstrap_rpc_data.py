@@ -4,7 +4,7 @@ from dataclasses import dataclass
 
 @dataclass
 class BloxstrapRPCImage:
-    source: Optional[str] = None
+    asset_id: Optional[str] = None  # Resolved to a thumbnail URL when the presence is updated
     hover_text: Optional[str] = None
     clear: bool = False
     reset: bool = False
@@ -1,8 +1,8 @@
-from typing import Literal, Optional
+from typing import Literal, Optional, Callable
 from dataclasses import dataclass
-import json
 
 from modules.logger import Logger
+from modules.networking import TokenBucket
 
 from pypresence import Presence, DiscordNotFound, PipeClosed  # type: ignore
 
@@ -59,33 +59,72 @@ class RichPresenceStatus:
         }
 
 
+@dataclass
+class RichPresenceMetrics:
+    sent: int = 0
+    coalesced: int = 0  # Queued, then made unnecessary: reverted to the shown status, or superseded by clearing the presence on exit
+    unchanged: int = 0  # Same as the latest status
+    dropped: int = 0  # Held back by the rate limit, then replaced by a newer status before it could be sent
+
+
 class RichPresenceClient:
+    """
+    Discord silently drops activity updates above its rate limit, so updates are queued instead of sent right away.
+    Only the latest status is kept, flush() sends it as soon as the rate limit allows.
+    """
     APP_ID: str = "1280969971303841924"
     _LOG_PREFIX: str = "RichPresenceClient"
+    _RATE_LIMIT: tuple[int, int] = (5, 20)  # Updates, seconds
 
     mode: Literal["Player", "Studio"]
     logo_asset_key: str
     client: Presence
+    metrics: RichPresenceMetrics
 
     _current_status: dict
+    _pending_status: Optional[dict] = None
+    _bucket: TokenBucket
+
 
+    def __init__(self, mode: Literal["Player", "Studio"], presence: Callable[[str], Presence] = Presence):
+        """presence creates the Discord client from the application ID"""
 
-    def __init__(self, mode: Literal["Player", "Studio"]):
         Logger.info("Initializing client...", prefix=self._LOG_PREFIX)
         self.mode = mode
         self._current_status = {}
+        self.metrics = RichPresenceMetrics()
+        updates, seconds = self._RATE_LIMIT
+        self._bucket = TokenBucket(updates / seconds, updates)
         self.logo_asset_key = "studio" if mode == "Studio" else "roblox"
-        self.client = Presence(self.APP_ID)
+        self.client = presence(self.APP_ID)
         Logger.info("Client ready!", prefix=self._LOG_PREFIX)
 
 
     def update(self, status: RichPresenceStatus) -> None:
         status_dict: dict = status.as_dict()
-        if status_dict == self._current_status:
+        latest_status: dict = self._pending_status if self._pending_status is not None else self._current_status
+        if status_dict == latest_status:
+            self.metrics.unchanged += 1
             return
-        # Logger.info(f"Updating RPC status: {json.dumps(status_dict)}", prefix=self._LOG_PREFIX)
+
+        if self._pending_status is not None:
+            if status_dict == self._current_status: self.metrics.coalesced += 1
+            else: self.metrics.dropped += 1
+        self._pending_status = None if status_dict == self._current_status else status_dict
+        self.flush()
+
+
+    def flush(self) -> None:
+        """Sends the queued status, if the rate limit allows it"""
+
+        if self._pending_status is None or not self._bucket.try_acquire(): return
+        status_dict: dict = self._pending_status
+        self._pending_status = None
+        changed: list[str] = [key for key, value in status_dict.items() if self._current_status.get(key) != value]
+        Logger.debug(f"Updating RPC status, changed: {', '.join(changed)}", prefix=self._LOG_PREFIX)
         self.client.update(**status_dict)
         self._current_status = status_dict
+        self.metrics.sent += 1
 
 
     def set_default_status(self, timestamp: int) -> None:
@@ -107,6 +146,11 @@ class RichPresenceClient:
 
     def __exit__(self, *_):
         Logger.info("Closing RPC client...", prefix=self._LOG_PREFIX)
+        # Not sent on purpose: the presence is cleared right after, which supersedes any queued status
+        if self._pending_status is not None:
+            self.metrics.coalesced += 1
+            self._pending_status = None
+        Logger.info(f"Status updates: {self.metrics.sent} sent, {self.metrics.coalesced} coalesced, {self.metrics.unchanged} unchanged, {self.metrics.dropped} dropped", prefix=self._LOG_PREFIX)
 
         try:
             self.client.clear()
@@ -1,55 +1,149 @@
-from typing import Optional, Literal
+from typing import Optional, Literal, BinaryIO, Iterator
 from pathlib import Path
 from datetime import datetime, timezone
+from threading import Event
+import calendar
 import time
+import os
 import re
 
 from modules.logger import Logger
-from modules.filesystem import Directories
+from modules.filesystem import Directories, FileWatcher
+
+
+_TIMESTAMP_PATTERN: str = r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\.\d{3}Z"
+_ENTRY_START: re.Pattern = re.compile(_TIMESTAMP_PATTERN)
+_ENTRY_START_BYTES: re.Pattern = re.compile(_TIMESTAMP_PATTERN.encode())
+_ENTRY_SPLIT: re.Pattern = re.compile(rf"\n(?={_TIMESTAMP_PATTERN})")  # Lines without a timestamp continue the previous entry
+_day_cache: dict[str, int] = {}
+
+
+def parse_timestamp(value: str) -> float:
+    """Fast path for the fixed-width 'YYYY-MM-DDTHH:MM:SS.mmmZ' format, anything else goes through strptime"""
+
+    if len(value) != 24 or value[10] != "T" or value[23] != "Z" or value[19] != ".":
+        return datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%fZ").replace(tzinfo=timezone.utc).timestamp()
+
+    date: str = value[:10]
+    day: int | None = _day_cache.get(date)
+    if day is None:
+        day = calendar.timegm((int(value[0:4]), int(value[5:7]), int(value[8:10]), 0, 0, 0))
+        _day_cache[date] = day
+    seconds: int = day + int(value[11:13]) * 3600 + int(value[14:16]) * 60 + int(value[17:19])
+    return (seconds * 1_000_000 + int(value[20:23]) * 1000) / 1_000_000  # Same rounding as datetime.timestamp()
 
 
 class LogEntry:
+    """Only the metadata is split off up front, the other fields are parsed on first access"""
+    __slots__ = ("full", "metadata", "_rest", "_timestamp", "_prefix", "_message")
+
     full: str
-    timestamp: float
-    level: Optional[str] = None
     metadata: str
-    prefix: Optional[str] = None
-    message: str
+    _rest: str
+    _timestamp: Optional[float]
+    _prefix: Optional[str]
+    _message: Optional[str]
 
     def __init__(self, data: str) -> None:
         self.full = data.strip()
-        split_data: list[str] = data.split()
+        metadata, _, rest = self.full.partition(" ")
+        rest = rest.strip()
+        if not rest: raise ValueError(f"Invalid log entry: {self.full}")
+        self.metadata = metadata
+        self._rest = rest
+        self._timestamp = None
+        self._prefix = None
+        self._message = None
+
+
+    @property
+    def timestamp(self) -> float:
+        if self._timestamp is None:
+            self._timestamp = parse_timestamp(self.metadata.split(",", 1)[0])
+        return self._timestamp
+
+
+    @property
+    def level(self) -> Optional[str]:
+        level: str = self.metadata.rsplit(",", 1)[-1]
+        return None if level.isdigit() else level
+
 
-        self.metadata = split_data[0]
-        split_metadata = self.metadata.split(",")
-        self.timestamp = datetime.strptime(split_metadata[0], "%Y-%m-%dT%H:%M:%S.%fZ").replace(tzinfo=timezone.utc).timestamp()
-        level: str = split_metadata[-1]
-        if not level.isdigit():
-            self.level = level
+    @property
+    def prefix(self) -> Optional[str]:
+        if self._message is None: self._split_message()
+        return self._prefix
 
-        prefix: str = split_data[1]
+
+    @property
+    def message(self) -> str:
+        if self._message is None: self._split_message()
+        return self._message  # type: ignore
+
+
+    def _split_message(self) -> None:
+        prefix, _, message = self._rest.partition(" ")
         if prefix.startswith("[") and prefix.endswith("]"):
-            self.prefix = prefix
-            self.message = self.full.replace(self.metadata, "", 1).replace(self.prefix, "", 1).strip()
+            self._prefix = prefix
+            self._message = message.strip()
         else:
-            self.message = self.full.replace(self.metadata, "", 1).strip()
-
+            self._message = self._rest
 
 
 class LogReader:
+    """Keeps the log file open and tails it. wait() wakes on change notifications, with adaptive polling as a fallback"""
     DIRECTORY: Path = Directories.ROBLOX / "Logs"
     _LOG_PREFIX: str = "LogReader"
+    _MIN_POLL_INTERVAL: float = 0.01
+    _MAX_POLL_INTERVAL: float = 0.25
 
     mode: Literal["Player", "Studio"]
     log_file: Path
-    _position: int = 0
+    markers: Optional[tuple[bytes, ...]]
+    _file: BinaryIO
+    _watcher: FileWatcher
+    _changed: Event
+    _poll_interval: float = _MIN_POLL_INTERVAL
+    _partial: bytes = b""  # Last entry, it may still get continuation lines or be incomplete
+
 
+    def __init__(self, mode: Literal["Player", "Studio"], markers: Optional[tuple[str, ...]] = None):
+        """If markers are given, only lines containing at least one of them are parsed"""
 
-    def __init__(self, mode: Literal["Player", "Studio"]):
         Logger.info("Initializing log reader...", prefix=self._LOG_PREFIX)
         self.mode = mode
-        self._readlines = []
+        self.markers = None if markers is None else tuple(marker.encode() for marker in markers)
         self._set_latest_log_file()
+        self._file = open(self.log_file, "rb")
+        self._changed = Event()
+        self._watcher = FileWatcher([self.log_file], self._changed.set, debounce=0)
+        self._watcher.start()
+
+
+    def close(self) -> None:
+        self._watcher.stop()
+        self._file.close()
+
+
+    def has_new_data(self) -> bool:
+        try: return os.fstat(self._file.fileno()).st_size > self._file.tell()
+        except (OSError, ValueError): return False
+
+
+    def wait(self, timeout: float) -> bool:
+        """Blocks until the log file grows or the timeout expires. Polling backs off while the log is idle"""
+
+        deadline: float = time.monotonic() + timeout
+        while True:
+            if self.has_new_data():
+                self._poll_interval = self._MIN_POLL_INTERVAL
+                return True
+            remaining: float = deadline - time.monotonic()
+            if remaining <= 0: return False
+            if self._changed.wait(min(self._poll_interval, remaining)):
+                self._changed.clear()
+            else:
+                self._poll_interval = min(self._poll_interval * 2, self._MAX_POLL_INTERVAL)
 
 
     def _set_latest_log_file(self) -> None:
@@ -64,16 +158,64 @@ class LogReader:
 
 
     def read_new(self) -> list[LogEntry]:
-        with open(self.log_file) as file:
-            file.seek(self._position)
-            new: str = file.read()
-            self._position = file.tell()
-
-        pattern: str = r'^(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\.\d{3}Z.*?)(?=^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\.\d{3}Z|$)'
-        matches = re.findall(pattern, new, re.DOTALL | re.MULTILINE)
-
-        entries: list[LogEntry] = []
-        for entry in matches:
-            try: entries.append(LogEntry(entry))
-            except Exception: pass
-        return entries
\ No newline at end of file
+        return list(self.iter_new())
+
+
+    def iter_new(self) -> Iterator[LogEntry]:
+        """
+        Yields complete entries only. Lines without a timestamp are appended to the previous entry's message.
+        The last entry is kept until the next one starts, or until a read finds no new data and its last line is complete.
+        """
+
+        data: bytes = self._file.read()
+        if data:
+            data = self._partial + data
+            start: int = self._find_last_entry(data)
+            self._partial = data[start:]
+            data = data[:start]
+        elif self._partial.endswith(b"\n"):
+            data = self._partial
+            self._partial = b""
+        if not data: return
+        data = data[:-1]  # Trailing newline of the last complete entry
+
+        entries: Iterator[str] | list[str]
+        if self.markers is None: entries = _ENTRY_SPLIT.split(data.decode("utf-8", errors="replace"))
+        else: entries = (data[start:stop].decode("utf-8", errors="replace") for start, stop in self._find_entries(data, self.markers))
+
+        for entry in entries:
+            if not _ENTRY_START.match(entry): continue  # Continuation lines before the first entry
+            try: yield LogEntry(entry)
+            except ValueError: continue
+
+
+    @staticmethod
+    def _find_last_entry(data: bytes) -> int:
+        """Returns the offset of the last line that starts an entry, or 0 if there is none"""
+
+        stop: int = len(data)
+        while stop > 0:
+            start: int = data.rfind(b"\n", 0, stop) + 1
+            if _ENTRY_START_BYTES.match(data, start): return start
+            stop = start - 1
+        return 0
+
+
+    @staticmethod
+    def _find_entries(data: bytes, markers: tuple[bytes, ...]) -> list[tuple[int, int]]:
+        """Returns the (start, stop) offsets of the entries that contain a marker, in order. Searching the raw bytes is much cheaper than splitting and decoding every line"""
+
+        entries: dict[int, int] = {}
+        for marker in markers:
+            index: int = data.find(marker)
+            while index != -1:
+                start: int = data.rfind(b"\n", 0, index) + 1
+                while start > 0 and not _ENTRY_START_BYTES.match(data, start):
+                    start = data.rfind(b"\n", 0, start - 1) + 1
+                stop: int = data.find(b"\n", index)
+                while stop != -1 and not _ENTRY_START_BYTES.match(data, stop + 1):
+                    stop = data.find(b"\n", stop + 1)
+                if stop == -1: stop = len(data)
+                entries[start] = stop
+                index = data.find(marker, stop)
+        return sorted(entries.items())
\ No newline at end of file
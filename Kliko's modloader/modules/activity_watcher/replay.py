@@ -0,0 +1,310 @@
+"""
+Replays a Roblox log through the Activity Watcher, without Roblox, Discord or network access.
+Run from the "Kliko's modloader" directory:
+
+    python -m modules.activity_watcher.replay <log file> [--mode Player|Studio] [--speed 10] [--api-latency 0.1]
+    python -m modules.activity_watcher.replay --synthetic 200000
+
+Reports entries/sec, the latency between writing a relevant log line and the next presence update, and memory usage over time.
+"""
+
+from typing import Literal, Optional, Any, Callable
+from pathlib import Path
+from threading import Thread, Event, Lock
+from datetime import datetime, timezone, timedelta
+import statistics
+import tempfile
+import argparse
+import time
+import re
+
+from modules.networking.metadata import RobloxMetadata
+from modules.networking.metadata_cache import MetadataCache
+from modules.interfaces.config import ConfigInterface, ConfigSnapshot
+
+from . import ActivityWatcher
+from .reader import LogReader, parse_timestamp
+from .data import Data
+
+import psutil  # type: ignore
+
+
+class _StubResponse:
+    _data: Any
+
+    def __init__(self, data: Any) -> None:
+        self._data = data
+
+    def json(self) -> Any:
+        return self._data
+
+
+class _StubApi:
+    """Local stand-in for the Roblox APIs used by the Activity Watcher, responses are made up from the requested IDs"""
+    latency: float
+    requests: int
+
+    _ROUTES: list[tuple[re.Pattern, Callable[[list[str]], Any]]] = [
+        (re.compile(r"/universes/v1/places/(\d+)/universe"), lambda ids: {"universeId": int(ids[0]) + 1}),
+        (re.compile(r"games\.roblox\.com/v1/games\?universeIds=([\d,]+)"), lambda ids: {"data": [{"id": int(id), "rootPlaceId": int(id) - 1, "name": f"Game {id}", "creator": {"name": f"Creator {id}"}} for id in ids]}),
+        (re.compile(r"/v1/games/icons\?universeIds=([\d,]+)"), lambda ids: {"data": [{"targetId": int(id), "state": "Completed", "imageUrl": f"https://replay.invalid/games/{id}.png"} for id in ids]}),
+        (re.compile(r"/v1/assets\?assetIds=([\d,]+)"), lambda ids: {"data": [{"targetId": int(id), "state": "Completed", "imageUrl": f"https://replay.invalid/assets/{id}.png"} for id in ids]}),
+        (re.compile(r"/v1/users/avatar-bust\?userIds=([\d,]+)"), lambda ids: {"data": [{"targetId": int(id), "state": "Completed", "imageUrl": f"https://replay.invalid/users/{id}.png"} for id in ids]}),
+        (re.compile(r"users\.roblox\.com/v1/users/(\d+)"), lambda ids: {"name": f"user{ids[0]}", "displayName": f"User {ids[0]}"})
+    ]
+
+
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+        self.requests = 0
+
+
+    def get(self, url: str, *_, **__) -> _StubResponse:
+        self.requests += 1
+        if self.latency: time.sleep(self.latency)
+        for pattern, handler in self._ROUTES:
+            match = pattern.search(url)
+            if match: return _StubResponse(handler(match.group(1).split(",")))
+        raise ValueError(f"Unexpected request: {url}")
+
+
+class _StubPresence:
+    """Stands in for pypresence.Presence"""
+    _on_update: Callable[[dict], Any]
+
+    def __init__(self, on_update: Callable[[dict], Any]) -> None:
+        self._on_update = on_update
+
+    def connect(self) -> None: pass
+    def clear(self) -> None: pass
+    def close(self) -> None: pass
+
+    def update(self, **status) -> None:
+        if status: self._on_update(status)
+
+
+class _StubRoblox:
+    """Roblox keeps 'running' until the replay is stopped"""
+    _stopped: Event
+
+    def __init__(self, stopped: Event) -> None:
+        self._stopped = stopped
+
+    def is_roblox_running(self, *_, **__) -> bool:
+        return not self._stopped.is_set()
+
+
+class _StubConfig:
+    """Default settings, with every Discord RPC feature enabled"""
+
+    @staticmethod
+    def snapshot() -> ConfigSnapshot:
+        return ConfigInterface.snapshot({**ConfigInterface.DEFAULT_CONFIG, "discord_rpc": True, "activity_joining": True, "show_user_in_rpc": True, "bloxstrap_rpc_sdk": True})
+
+    @staticmethod
+    def add_callback(*_, **__) -> str: return "replay"
+
+    @staticmethod
+    def remove_callback(*_, **__) -> None: pass
+
+
+class _ReplayLogReader(LogReader):
+    def __init__(self, log_file: Path, mode: Literal["Player", "Studio"], markers: Optional[tuple[str, ...]] = None) -> None:
+        self.log_file = log_file
+        super().__init__(mode, markers=markers)
+
+    def _set_latest_log_file(self) -> None: pass
+
+
+def generate_log(lines: int, mode: Literal["Player", "Studio"]) -> list[str]:
+    """Mostly network noise, with a game join, a BloxstrapRPC update every 5% of the log and an exit message at the end"""
+
+    start: datetime = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    join_line: int = lines // 10
+    rpc_interval: int = max(lines // 20, 1)
+
+    def format_line(index: int, prefix: str, message: str) -> str:
+        timestamp: str = (start + timedelta(milliseconds=index)).strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3]
+        return f"{timestamp}Z,{index / 1000:.6f},1a2b,6 {prefix} {message}\n"
+
+    log: list[str] = []
+    for index in range(lines - 1):
+        if mode == "Player" and index == join_line:
+            log.append(format_line(index, Data.Player.GameID.prefix, f"{Data.Player.GameID.startswith}'00000000-0000-0000-0000-000000000000' place 1818 at 10.0.0.1"))
+        elif mode == "Player" and index == join_line + 1:
+            log.append(format_line(index, Data.Player.Join.prefix, f"{Data.Player.Join.startswith}: placeid:1818, visitid:0, universeid:1819, userid:156, joinTime:1.5"))
+        elif mode == "Studio" and index == join_line:
+            log.append(format_line(index, Data.Studio.Join.prefix, f"{Data.Studio.Join.startswith}1818{Data.Studio.Join.endswith}"))
+        elif index > join_line + 1 and index % rpc_interval == 0:
+            log.append(format_line(index, Data.BloxstrapRPC.prefix, f'{Data.BloxstrapRPC.startswith} {{"command": "SetRichPresence", "data": {{"details": "Replay {index}", "smallImage": {{"assetId": {index}}}}}}}'))
+        else:
+            log.append(format_line(index, "[FLog::Network]", f"Packet {index} received from 10.0.0.1|49152, ping 42ms, queue 0"))
+
+    exit_message: type = Data.Player.Exit if mode == "Player" else Data.Studio.Exit
+    log.append(format_line(lines - 1, exit_message.prefix, exit_message.message))
+    return log
+
+
+class Replay:
+    lines: list[str]
+    mode: Literal["Player", "Studio"]
+    speed: float
+    api: _StubApi
+    output: Path
+
+    updates: int
+    latencies: list[float]
+    memory: list[tuple[float, float]]  # Seconds since start, RSS in MB
+
+    _stopped: Event
+    _lock: Lock
+    _pending_writes: list[float]  # Times at which relevant lines were written, waiting for the next presence update
+    _markers: tuple[str, ...]
+
+    _BATCH_SIZE: int = 1000
+    _MEMORY_INTERVAL: float = 0.5
+    _SETTLE_TIME: float = 1
+
+
+    def __init__(self, lines: list[str], mode: Literal["Player", "Studio"], speed: float = 0, api_latency: float = 0) -> None:
+        """A speed of 0 writes the log as fast as possible, otherwise log timestamps are followed at the given speed-up"""
+
+        self.lines = lines
+        self.mode = mode
+        self.speed = speed
+        self.api = _StubApi(api_latency)
+        self.updates = 0
+        self.latencies = []
+        self.memory = []
+        self._stopped = Event()
+        self._lock = Lock()
+        self._pending_writes = []
+
+
+    def run(self) -> float:
+        """Returns the number of seconds between the first write and the log being fully read"""
+
+        with tempfile.TemporaryDirectory() as directory:
+            self.output = Path(directory) / f"replay_{self.mode}_log.log"
+            self.output.touch()
+
+            watcher: ActivityWatcher = ActivityWatcher(
+                config_source=_StubConfig,
+                roblox=_StubRoblox(self._stopped),
+                log_reader=lambda mode, markers=None: _ReplayLogReader(self.output, mode, markers),
+                presence=lambda *_, **__: _StubPresence(self._on_presence_update)
+            )
+            watcher.mode = self.mode
+            self._markers = watcher._get_markers()
+            RobloxMetadata.configure(http=self.api)
+            MetadataCache.configure(in_memory=True)  # Start with an empty cache
+
+            elapsed: float = 0
+            try:
+                watcher_thread: Thread = Thread(target=watcher.run, args=(self.mode,), daemon=True)
+                memory_thread: Thread = Thread(target=self._sample_memory, daemon=True)
+                memory_thread.start()
+                watcher_thread.start()
+
+                started: float = time.perf_counter()
+                self._write_log()
+                while watcher_thread.is_alive():
+                    reader: LogReader | None = getattr(watcher, "reader", None)
+                    if reader is not None and not reader.has_new_data(): break
+                    time.sleep(0.005)
+                elapsed = time.perf_counter() - started
+
+                self._wait_until_settled(watcher_thread)
+                self._stopped.set()
+                watcher_thread.join()
+                memory_thread.join()
+            finally:
+                self._stopped.set()
+                MetadataCache.configure()
+                RobloxMetadata.configure()
+        return elapsed
+
+
+    def _write_log(self) -> None:
+        previous: float | None = None
+        batch: list[str] = []
+
+        with open(self.output, "a", encoding="utf-8", newline="") as file:
+            def flush() -> None:
+                file.write("".join(batch))
+                file.flush()
+                now: float = time.perf_counter()
+                relevant: int = sum(1 for line in batch if any(marker in line for marker in self._markers))
+                with self._lock: self._pending_writes.extend([now] * relevant)
+                batch.clear()
+
+            for line in self.lines:
+                if self.speed > 0:
+                    try: timestamp: float | None = parse_timestamp(line[:24])
+                    except ValueError: timestamp = None
+                    if timestamp is not None:
+                        if previous is not None and timestamp > previous:
+                            if batch: flush()
+                            time.sleep((timestamp - previous) / self.speed)
+                        previous = timestamp
+
+                batch.append(line)
+                if len(batch) >= self._BATCH_SIZE: flush()
+            if batch: flush()
+
+
+    def _wait_until_settled(self, watcher_thread: Thread) -> None:
+        """Gives the watcher time to finish its API requests and presence updates"""
+
+        last_updates: int = -1
+        while watcher_thread.is_alive() and last_updates != self.updates:
+            last_updates = self.updates
+            watcher_thread.join(self._SETTLE_TIME)
+
+
+    def _on_presence_update(self, _: dict) -> None:
+        now: float = time.perf_counter()
+        with self._lock:
+            self.updates += 1
+            self.latencies.extend(now - written for written in self._pending_writes)
+            self._pending_writes.clear()
+
+
+    def _sample_memory(self) -> None:
+        process = psutil.Process()
+        started: float = time.perf_counter()
+        while True:
+            self.memory.append((time.perf_counter() - started, process.memory_info().rss / 1_000_000))
+            if self._stopped.wait(self._MEMORY_INTERVAL): break
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replays a Roblox log through the Activity Watcher")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("log", nargs="?", type=Path, help="Recorded Roblox log file")
+    source.add_argument("--synthetic", type=int, metavar="LINES", help="Generate a synthetic log with this many lines")
+    parser.add_argument("--mode", choices=["Player", "Studio"], help="Defaults to the mode in the log's filename, or Player")
+    parser.add_argument("--speed", type=float, default=0, help="Speed-up relative to the log's timestamps, 0 replays as fast as possible")
+    parser.add_argument("--api-latency", type=float, default=0, help="Seconds added to every API request")
+    args = parser.parse_args()
+
+    mode: Literal["Player", "Studio"] = args.mode or ("Studio" if args.log is not None and "_studio_" in args.log.name.lower() else "Player")
+    if args.synthetic is not None: lines: list[str] = generate_log(args.synthetic, mode)
+    else:
+        with open(args.log, "r", encoding="utf-8", errors="replace", newline="") as file: lines = file.readlines()
+
+    replay: Replay = Replay(lines, mode, speed=args.speed, api_latency=args.api_latency)
+    elapsed: float = replay.run()
+
+    print(f"Replayed {len(lines)} lines in {elapsed:.3f}s ({len(lines) / max(elapsed, 1e-9):.0f} entries/s)")
+    print(f"Presence updates: {replay.updates}, API requests: {replay.api.requests}")
+    if replay.latencies:
+        latencies: list[float] = sorted(replay.latencies)
+        p95: float = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        print(f"Latency (log write -> presence update): median {statistics.median(latencies) * 1000:.1f} ms, p95 {p95 * 1000:.1f} ms, max {latencies[-1] * 1000:.1f} ms")
+    print("Memory (RSS): " + ", ".join(f"{seconds:.1f}s {rss:.1f} MB" for seconds, rss in replay.memory))
+    if replay.memory: print(f"Peak memory (RSS): {max(rss for _, rss in replay.memory):.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
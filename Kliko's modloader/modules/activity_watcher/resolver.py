@@ -0,0 +1,254 @@
+from typing import Optional, Callable, Any, TypeVar
+from dataclasses import dataclass
+from threading import Thread, Event, Lock
+from concurrent.futures import ThreadPoolExecutor, Future
+import time
+
+from modules.logger import Logger
+from modules.networking import RobloxMetadata, GameInfo, UserInfo, TokenBucket
+
+
+T = TypeVar("T")
+
+
+@dataclass
+class MetadataRequest:
+    key: Any  # Passed back to the callback, lets the caller tell which game the metadata belongs to
+    place_id: Optional[str] = None
+    universe_id: Optional[str] = None
+    user_id: Optional[str] = None
+
+
+@dataclass
+class ResolvedMetadata:
+    universe_id: Optional[str] = None
+    root_place_id: Optional[str] = None
+    name: Optional[str] = None
+    creator: Optional[str] = None
+    thumbnail: Optional[str] = None
+    user_name: Optional[str] = None
+    user_thumbnail: Optional[str] = None
+
+
+class MetadataResolver:
+    """Looks up game and user metadata on a background thread. Requests submitted while a batch is being resolved are combined into the next batch"""
+    callback: Callable[[Any, ResolvedMetadata], Any]
+
+    _pending: list[MetadataRequest]
+    _lock: Lock
+    _event: Event
+    _thread: Optional[Thread] = None
+    _closed: bool = False
+
+    _MAX_WORKERS: int = 4
+    _LOG_PREFIX: str = "MetadataResolver"
+
+
+    def __init__(self, callback: Callable[[Any, ResolvedMetadata], Any]) -> None:
+        """callback is called from the background thread with the request key and whatever could be resolved"""
+
+        self.callback = callback
+        self._pending = []
+        self._lock = Lock()
+        self._event = Event()
+
+
+    def submit(self, key: Any, place_id: Optional[str] = None, universe_id: Optional[str] = None, user_id: Optional[str] = None) -> None:
+        with self._lock:
+            if self._closed: return
+            self._pending.append(MetadataRequest(key, place_id=place_id, universe_id=universe_id, user_id=user_id))
+            self._event.set()
+            if self._thread is None:
+                self._thread = Thread(target=self._run, daemon=True)
+                self._thread.start()
+
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            self._event.set()
+
+
+    def _run(self) -> None:
+        while True:
+            self._event.wait()
+            with self._lock:
+                if self._closed: return
+                batch: list[MetadataRequest] = self._pending
+                self._pending = []
+                self._event.clear()
+
+            for request, metadata in zip(batch, self._resolve(batch)):
+                try: self.callback(request.key, metadata)
+                except Exception as e: Logger.error(f"Callback failed! {type(e).__name__}: {e}", prefix=self._LOG_PREFIX)
+
+
+    def _resolve(self, batch: list[MetadataRequest]) -> list[ResolvedMetadata]:
+        """One request per endpoint for the whole batch (except for the endpoints that only take a single ID), the endpoints are queried concurrently"""
+
+        results: list[ResolvedMetadata] = [ResolvedMetadata(universe_id=request.universe_id) for request in batch]
+        for request, metadata in zip(batch, results):
+            if metadata.universe_id is None and request.place_id is not None:
+                metadata.universe_id = self._try(RobloxMetadata.get_universe_id, request.place_id)
+
+        universe_ids: set[str] = {metadata.universe_id for metadata in results if metadata.universe_id is not None}
+        user_ids: set[str] = {request.user_id for request in batch if request.user_id is not None}
+        with ThreadPoolExecutor(max_workers=self._MAX_WORKERS) as executor:
+            games_future: Future = executor.submit(self._try, RobloxMetadata.get_games, universe_ids)
+            thumbnails_future: Future = executor.submit(self._try, RobloxMetadata.get_game_thumbnails, universe_ids)
+            user_thumbnails_future: Future = executor.submit(self._try, RobloxMetadata.get_user_thumbnails, user_ids)
+            user_futures: dict[str, Future] = {user_id: executor.submit(self._try, RobloxMetadata.get_user, user_id) for user_id in user_ids}
+        games: dict[str, GameInfo] = games_future.result() or {}
+        thumbnails: dict[str, str] = thumbnails_future.result() or {}
+        user_thumbnails: dict[str, str] = user_thumbnails_future.result() or {}
+        users: dict[str, UserInfo | None] = {user_id: future.result() for user_id, future in user_futures.items()}
+
+        for request, metadata in zip(batch, results):
+            if metadata.universe_id is not None:
+                game: GameInfo | None = games.get(metadata.universe_id)
+                if game is not None:
+                    metadata.root_place_id = game.root_place_id
+                    metadata.name = game.name
+                    metadata.creator = game.creator
+                metadata.thumbnail = thumbnails.get(metadata.universe_id)
+            if request.user_id is not None:
+                user: UserInfo | None = users.get(request.user_id)
+                if user is not None: metadata.user_name = user.display_name
+                metadata.user_thumbnail = user_thumbnails.get(request.user_id)
+        return results
+
+
+    def _try(self, function: Callable[..., T], *args) -> T | None:
+        try: return function(*args)
+        except Exception as e:
+            Logger.warning(f"{function.__name__} failed! {type(e).__name__}: {e}", prefix=self._LOG_PREFIX)
+            return None
+
+
+class AssetThumbnailResolver:
+    """
+    Resolves asset IDs (BloxstrapRPC images) to thumbnail URLs on a background thread.
+    Games may send a new image every frame, so lookups are rate limited and duplicate lookups are coalesced.
+    While waiting for the rate limit, only the most recently requested assets are kept.
+    Failed lookups and thumbnails that aren't ready yet are retried with a growing delay, up to _MAX_ATTEMPTS times.
+    """
+    callback: Callable[[], Any]
+
+    _cache: dict[str, Optional[str]]  # None if the asset has no thumbnail
+    _pending: dict[str, None]  # Ordered by request time
+    _in_flight: set[str]
+    _attempts: dict[str, int]  # Failed lookups per asset
+    _retries: dict[str, float]  # Monotonic time at which the asset is looked up again
+    _bucket: TokenBucket
+    _lock: Lock
+    _event: Event
+    _thread: Optional[Thread] = None
+    _closed: bool = False
+
+    _MAX_PENDING: int = 4
+    _RATE: float = 1  # Lookups per second
+    _BURST: int = 5
+    _STOP_CHECK_INTERVAL: float = 0.5
+    _MAX_ATTEMPTS: int = 3
+    _RETRY_DELAY: float = 5  # Seconds, doubled after every failed attempt
+    _LOG_PREFIX: str = "AssetThumbnailResolver"
+
+
+    def __init__(self, callback: Callable[[], Any]) -> None:
+        """callback is called from the background thread whenever new thumbnails were resolved"""
+
+        self.callback = callback
+        self._cache = {}
+        self._pending = {}
+        self._in_flight = set()
+        self._attempts = {}
+        self._retries = {}
+        self._bucket = TokenBucket(self._RATE, self._BURST)
+        self._lock = Lock()
+        self._event = Event()
+
+
+    def get(self, asset_id: str) -> Optional[str]:
+        """Returns None if the thumbnail isn't known yet, a lookup is started in that case"""
+
+        with self._lock:
+            if asset_id in self._cache: return self._cache[asset_id]
+            if self._closed or asset_id in self._in_flight or asset_id in self._retries: return None
+
+            self._add_pending(asset_id)
+            self._event.set()
+            if self._thread is None:
+                self._thread = Thread(target=self._run, daemon=True)
+                self._thread.start()
+        return None
+
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            self._event.set()
+
+
+    def _add_pending(self, asset_id: str) -> None:
+        """Caller must hold the lock"""
+
+        self._pending.pop(asset_id, None)
+        self._pending[asset_id] = None
+        while len(self._pending) > self._MAX_PENDING:
+            del self._pending[next(iter(self._pending))]
+
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                if self._closed: return
+                now: float = time.monotonic()
+                for asset_id, retry_at in list(self._retries.items()):
+                    if retry_at > now: continue
+                    del self._retries[asset_id]
+                    self._add_pending(asset_id)
+                idle: bool = not self._pending
+                if idle: self._event.clear()
+                timeout: Optional[float] = min(self._retries.values()) - now if self._retries else None
+
+            # A token is only taken once there is something to look up
+            if idle:
+                self._event.wait(timeout)
+                continue
+            while not self._bucket.acquire(timeout=self._STOP_CHECK_INTERVAL):
+                if self._closed: return
+
+            with self._lock:
+                if self._closed: return
+                batch: list[str] = list(self._pending)
+                self._pending.clear()
+                self._in_flight.update(batch)
+
+            try: thumbnails: dict[str, str] | None = RobloxMetadata.get_asset_thumbnails(batch)
+            except Exception as e:
+                Logger.warning(f"Failed to load BloxstrapRPC images! {type(e).__name__}: {e}", prefix=self._LOG_PREFIX)
+                thumbnails = None
+
+            resolved: bool = False
+            with self._lock:
+                self._in_flight.difference_update(batch)
+                now = time.monotonic()
+                for asset_id in batch:
+                    url: Optional[str] = None if thumbnails is None else thumbnails.get(asset_id)
+                    if url is not None:
+                        self._cache[asset_id] = url
+                        self._attempts.pop(asset_id, None)
+                        resolved = True
+                        continue
+
+                    attempts: int = self._attempts.get(asset_id, 0) + 1
+                    if attempts >= self._MAX_ATTEMPTS:  # Give up, the asset has no thumbnail
+                        self._cache[asset_id] = None
+                        self._attempts.pop(asset_id, None)
+                    else:
+                        self._attempts[asset_id] = attempts
+                        self._retries[asset_id] = now + self._RETRY_DELAY * 2 ** (attempts - 1)
+            if not resolved: continue
+
+            try: self.callback()
+            except Exception as e: Logger.error(f"Callback failed! {type(e).__name__}: {e}", prefix=self._LOG_PREFIX)
\ No newline at end of file
@@ -1,23 +1,155 @@
-from typing import Any
+from typing import Any, Optional, Callable
 from pathlib import Path
+from threading import Lock, Timer
+import atexit
 import json
+import os
 
 
 class ConfigEditor:
+    """
+    If cached is True, parsed data is kept in memory and only re-read once the file's mtime or size changes.
+    If write_delay is set, writes within that many seconds are coalesced into a single save (flushed at exit at the latest).
+    Cached reads return a copy, unless copy is False. In that case the returned data is shared and must not be modified.
+    The cache keeps the serialized text, copies are made by parsing it again, which is faster than deepcopy().
+    version changes whenever cached reads may return different data, callers can use it to key data derived from it.
+    """
     file: Path
     delete_if_empty: bool
+    cached: bool
+    write_delay: float
+    version: int = 0
 
+    _text: Optional[str] = None
+    _data: Any = None  # Parsed from _text on the first read with copy=False
+    _signature: Optional[tuple[int, int]] = None
+    _pending_text: Optional[str] = None
+    _pending_data: Any = None
+    _pending_empty: bool = False
+    _timer: Optional[Timer] = None
+    _lock: Lock
 
-    def __init__(self, file: Path, delete_if_empty: bool = False):
+    _instances: list["ConfigEditor"] = []
+
+
+    def __init__(self, file: Path, delete_if_empty: bool = False, cached: bool = False, write_delay: float = 0):
         self.file = file
         self.delete_if_empty = delete_if_empty
+        self.cached = cached
+        self.write_delay = write_delay
+        self._lock = Lock()
+        if write_delay: ConfigEditor._instances.append(self)
+
+
+    def read(self, copy: bool = True) -> Any:
+        if not self.cached:
+            with open(self.file, "r") as file: return json.load(file)
+
+        with self._lock: return self._read(copy)
+
+
+    def _read(self, copy: bool) -> Any:
+        """Caller must hold the lock"""
 
+        if self._pending_text is not None:
+            if self._pending_empty and self.delete_if_empty: raise FileNotFoundError(str(self.file))
+            if copy: return json.loads(self._pending_text)
+            if self._pending_data is None: self._pending_data = json.loads(self._pending_text)
+            return self._pending_data
 
-    def read(self) -> Any:
-        with open(self.file, "r") as file: return json.load(file)
+        try: stat: os.stat_result = self.file.stat()
+        except FileNotFoundError:
+            if self._text is not None: self._clear_cache()
+            raise
+        signature: tuple[int, int] = (stat.st_mtime_ns, stat.st_size)
+        if signature != self._signature or self._text is None:
+            with open(self.file, "r") as file: self._text = file.read()
+            self._data = None
+            self._signature = signature
+            self.version += 1
+        if copy: return json.loads(self._text)
+        if self._data is None: self._data = json.loads(self._text)
+        return self._data
 
 
     def write(self, data: dict | list) -> None:
+        text: str = json.dumps(data, indent=4)  # Also takes a snapshot, the caller may keep modifying data
+        with self._lock: self._write(text, not data)
+
+
+    def update(self, function: Callable[[Any], Any]) -> None:
+        """Read-modify-write while holding the lock, so concurrent updates aren't lost. function modifies the data in place"""
+
+        with self._lock:
+            if self.cached: data: Any = self._read(copy=True)
+            else:
+                with open(self.file, "r") as file: data = json.load(file)
+            function(data)
+            self._write(json.dumps(data, indent=4), not data)
+
+
+    def _write(self, text: str, empty: bool) -> None:
+        """Caller must hold the lock"""
+
+        if not self.write_delay:
+            self._save(text, empty)
+            return
+
+        self._pending_text = text
+        self._pending_data = None
+        self._pending_empty = empty
+        self.version += 1
+        if self._timer is None:
+            self._timer = Timer(self.write_delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+
+    def flush(self) -> None:
+        """Saves pending writes immediately"""
+
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if self._pending_text is None: return
+            self._save(self._pending_text, self._pending_empty)
+            self._pending_text = None
+            self._pending_data = None
+
+
+    @classmethod
+    def flush_all(cls) -> None:
+        for instance in cls._instances:
+            instance.flush()
+
+
+    def _save(self, text: str, empty: bool) -> None:
+        """Writes to a temporary file first, so readers never see a partially written file"""
+
+        if empty and self.delete_if_empty:
+            self.file.unlink(missing_ok=True)
+            self._clear_cache()
+            return
+
         if not self.file.parent.exists(): self.file.parent.mkdir(parents=True, exist_ok=True)
-        with open(self.file, "w") as file: json.dump(data, file, indent=4)
-        if not data and self.delete_if_empty: self.file.unlink()
\ No newline at end of file
+        temp: Path = self.file.with_name(f"{self.file.name}.tmp")
+        with open(temp, "w") as file: file.write(text)
+        os.replace(temp, self.file)
+
+        if self.cached:
+            stat: os.stat_result = self.file.stat()
+            self._text = text
+            self._data = None
+            self._signature = (stat.st_mtime_ns, stat.st_size)
+            self.version += 1
+
+
+    def _clear_cache(self) -> None:
+        self._text = None
+        self._data = None
+        self._signature = None
+        self.version += 1
+
+
+atexit.register(ConfigEditor.flush_all)
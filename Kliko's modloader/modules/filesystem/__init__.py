@@ -4,4 +4,5 @@ from .compress import compress
 from .open import open
 from .download_stream import DownloadStream
 from .download import download
+from .watcher import FileWatcher
 from .exceptions import *
\ No newline at end of file
@@ -1,12 +1,23 @@
 from pathlib import Path
-from zipfile import ZipFile
-from typing import Literal
+from zipfile import ZipFile, ZipInfo, ZIP_STORED, ZIP_DEFLATED
+from concurrent.futures import ThreadPoolExecutor, Future
+from collections import deque
+from typing import Literal, Optional
+import shutil
 import os
 
 from py7zr import SevenZipFile # type: ignore
 
 
-def compress(source: str | Path, destination: str | Path, format: Literal[".zip", ".7z"] = False, ignore_filetype: bool = False) -> None:
+STORED_FILETYPES: set[str] = {".png", ".jpg", ".jpeg", ".webp", ".ogg", ".mp3", ".zip", ".7z"}  # Already compressed, deflating them again only costs time
+DEFAULT_COMPRESSION_LEVEL: int = 6
+STREAM_THRESHOLD: int = 64 * 1024 * 1024  # Larger members are streamed through ZipFile.open() instead of being read into memory
+MAX_PENDING_BYTES: int = 256 * 1024 * 1024  # Upper bound on the size of the members that are read ahead
+
+_CHUNK_SIZE: int = 1024 * 1024
+
+
+def compress(source: str | Path, destination: str | Path, format: Literal[".zip", ".7z"] = False, ignore_filetype: bool = False, workers: Optional[int] = None) -> None:
     """Destination may be a file or directory"""
 
     source = Path(source).resolve()
@@ -14,45 +25,100 @@ def compress(source: str | Path, destination: str | Path, format: Literal[".zip"
 
     if not source.exists(): raise FileNotFoundError(f"Source not found: {source}")
 
+    if source.is_file(): members: list[tuple[Path, str]] = [(source, source.name)]
+    elif source.is_dir(): members = _get_members(source)
+    else: raise ValueError(f"Source is not a file or directory: {source}")
+
     match format:
         case ".zip":
             if not ignore_filetype and destination.suffix != ".zip":
                 destination = destination.with_name(f"{destination.name}.zip")
             destination.parent.mkdir(parents=True, exist_ok=True)
+            temp: Path = destination.with_name(f"{destination.name}.tmp")
 
-            if source.is_file():
-                with ZipFile(destination, "w") as archive:
-                    archive.write(source, source.name)
-
-            elif source.is_dir():
-                with ZipFile(destination, "w") as archive:
-                    for dirpath, _, filenames in os.walk(source):
-                        dirpath = Path(dirpath).resolve()
-                        for filename in filenames:
-                            filepath = dirpath / filename
-                            arcname = filepath.relative_to(source)
-                            archive.write(filepath, arcname)
-
-            else: raise ValueError(f"Source is not a file or directory: {source}")
+            try:
+                with ZipFile(temp, "w", compresslevel=DEFAULT_COMPRESSION_LEVEL) as archive:
+                    _write_zip_members(archive, members, workers)
+                temp.replace(destination)
+            finally:
+                temp.unlink(missing_ok=True)
 
         case ".7z":
             if not ignore_filetype and destination.suffix != ".7z":
                 destination = destination.with_name(f"{destination.name}.7z")
             destination.parent.mkdir(parents=True, exist_ok=True)
+            temp = destination.with_name(f"{destination.name}.tmp")
+
+            # 7z archives are compressed as a single solid stream, so members can't be compressed independently
+            try:
+                with SevenZipFile(temp, "w") as archive:
+                    for path, arcname in members:
+                        archive.write(path, arcname)
+                temp.replace(destination)
+            finally:
+                temp.unlink(missing_ok=True)
+
+        case other: raise ValueError(f"Unsupported format: {other}")
+
+
+def _get_members(source: Path) -> list[tuple[Path, str]]:
+    members: list[tuple[Path, str]] = []
+    for dirpath, _, filenames in os.walk(source):
+        dirpath = Path(dirpath).resolve()
+        for filename in filenames:
+            filepath = dirpath / filename
+            members.append((filepath, filepath.relative_to(source).as_posix()))
+    return members
+
+
+def _get_compress_type(path: Path) -> int:
+    return ZIP_STORED if path.suffix.lower() in STORED_FILETYPES else ZIP_DEFLATED
+
+
+def _get_zinfo(path: Path, arcname: str) -> ZipInfo:
+    zinfo: ZipInfo = ZipInfo.from_file(path, arcname)
+    zinfo.compress_type = _get_compress_type(path)
+    return zinfo
+
+
+def _read_member(path: Path) -> bytes:
+    with open(path, "rb") as file:
+        return file.read()
+
+
+def _stream_member(archive: ZipFile, path: Path, arcname: str) -> None:
+    with open(path, "rb") as source, archive.open(_get_zinfo(path, arcname), "w") as destination:
+        shutil.copyfileobj(source, destination, _CHUNK_SIZE)
+
 
-            if source.is_file():
-                with SevenZipFile(destination, "w") as archive:
-                    archive.write(source, source.name)
+def _write_zip_members(archive: ZipFile, members: list[tuple[Path, str]], workers: Optional[int]) -> None:
+    """
+    ZipFile has no public way to add pre-compressed data, so members are compressed by this thread as they're written.
+    The workers read the next members ahead in the meantime.
+    """
 
-            elif source.is_dir():
-                with SevenZipFile(destination, "w") as archive:
-                    for dirpath, _, filenames in os.walk(source):
-                        dirpath = Path(dirpath).resolve()
-                        for filename in filenames:
-                            filepath = dirpath / filename
-                            arcname = filepath.relative_to(source)
-                            archive.write(filepath, arcname)
+    sizes: list[int] = [path.stat().st_size for path, _ in members]
+    max_workers: int = workers or min(8, os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # Large members are streamed instead of read ahead, pending reads are limited by their total size
+        pending: deque[tuple[Path, str, int, Optional[Future[bytes]]]] = deque()
+        pending_bytes: int = 0
+        iterator = iter(zip(members, sizes))
+        next_member: tuple[tuple[Path, str], int] | None = next(iterator, None)
 
-            else: raise ValueError(f"Source is not a file or directory: {source}")
+        while pending or next_member is not None:
+            while next_member is not None:
+                (path, arcname), size = next_member
+                streamed: bool = size > STREAM_THRESHOLD
+                if pending and not streamed and pending_bytes + size > MAX_PENDING_BYTES:
+                    break
+                pending.append((path, arcname, size, None if streamed else executor.submit(_read_member, path)))
+                if not streamed: pending_bytes += size
+                next_member = next(iterator, None)
 
-        case other: raise ValueError(f"Unsupported format: {other}")
\ No newline at end of file
+            path, arcname, size, future = pending.popleft()
+            if future is None:
+                _stream_member(archive, path, arcname)
+            else:
+                archive.writestr(_get_zinfo(path, arcname), future.result())
+                pending_bytes -= size
\ No newline at end of file
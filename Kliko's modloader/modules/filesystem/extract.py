@@ -1,31 +1,138 @@
 from pathlib import Path
-from zipfile import ZipFile
+from zipfile import ZipFile, ZipInfo
+from concurrent.futures import ThreadPoolExecutor
+from threading import local, Lock
+from typing import Optional, Callable, Any
+from fnmatch import fnmatch
+import zlib
+import os
 
 from py7zr import SevenZipFile # type: ignore
 
 
-def extract(source: str | Path, destination: str | Path, ignore_filetype: bool = False) -> None:
+def extract(source: str | Path, destination: str | Path, ignore_filetype: bool = False, include: Optional[str | Callable[[str], bool]] = None, skip_identical: bool = False, on_progress: Optional[Callable[[int, int], Any]] = None, workers: Optional[int] = None) -> None:
+    """
+    include may be a glob pattern or a predicate, it receives the member name (using forward slashes).
+    skip_identical skips members whose destination already has the same size and CRC.
+    Existing files are replaced rather than overwritten in place, they may be hard links into the mod store.
+    on_progress receives (bytes_done, bytes_total).
+    """
+
     source = Path(source).resolve()
     destination = Path(destination).resolve()
 
     if not source.is_file(): raise FileNotFoundError(f"File not found: {source}")
     if destination.is_file(): raise NotADirectoryError(f"Destination exists but is not a directory: {destination}")
 
+    if isinstance(include, str):
+        pattern: str = include
+        include = lambda name: fnmatch(name, pattern)
+
     if ignore_filetype:
         destination.mkdir(parents=True, exist_ok=True)
-        with ZipFile(source, "r") as archive:
-            archive.extractall(destination)
+        _extract_zip(source, destination, include, skip_identical, on_progress, workers)
         return
 
     match source.suffix:
         case ".zip":
             destination.mkdir(parents=True, exist_ok=True)
-            with ZipFile(source, "r") as archive:
-                archive.extractall(destination)
+            _extract_zip(source, destination, include, skip_identical, on_progress, workers)
 
         case ".7z":
             destination.mkdir(parents=True, exist_ok=True)
-            with SevenZipFile(source, "r") as archive:
-                archive.extractall(destination)
+            _extract_7z(source, destination, include, skip_identical, on_progress)
+
+        case other: raise ValueError(f"Unsupported filetype: {other}")
+
+
+def _is_identical(target: Path, destination: Path, size: int, crc: int | None) -> bool:
+    if crc is None: return False
+    if not target.is_relative_to(destination): return False  # Let the archive library deal with unsafe paths
+    try:
+        if target.stat().st_size != size: return False
+        target_crc: int = 0
+        with open(target, "rb") as file:
+            for chunk in iter(lambda: file.read(1024 * 1024), b""):
+                target_crc = zlib.crc32(chunk, target_crc)
+        return target_crc == crc
+    except OSError: return False
+
+
+def _unlink_existing(target: Path, destination: Path) -> None:
+    if not target.is_relative_to(destination): return
+    try: target.unlink()
+    except (FileNotFoundError, IsADirectoryError, PermissionError): pass  # Windows raises PermissionError for directories
+
+
+def _extract_zip(source: Path, destination: Path, include: Optional[Callable[[str], bool]], skip_identical: bool, on_progress: Optional[Callable[[int, int], Any]], workers: Optional[int]) -> None:
+    with ZipFile(source, "r") as archive:
+        members: list[ZipInfo] = archive.infolist()
+
+    if include is not None:
+        members = [member for member in members if member.is_dir() or include(member.filename)]
+
+    total: int = sum(member.file_size for member in members)
+    done: int = 0
+    progress_lock: Lock = Lock()
+    handles: local = local()
+    opened_archives: list[ZipFile] = []
+
+    def get_archive() -> ZipFile:  # ZipFile handles are not shared between threads
+        archive: ZipFile | None = getattr(handles, "archive", None)
+        if archive is None:
+            archive = ZipFile(source, "r")
+            handles.archive = archive
+            with progress_lock:
+                opened_archives.append(archive)
+        return archive
+
+    def worker(member: ZipInfo) -> None:
+        nonlocal done
+        target: Path = destination.joinpath(*member.filename.split("/"))
+        if not (skip_identical and not member.is_dir() and _is_identical(target, destination, member.file_size, member.CRC)):
+            if not member.is_dir(): _unlink_existing(target, destination)
+            try: get_archive().extract(member, destination)
+            except FileExistsError:  # Another thread created the same parent directory in between the exists check and makedirs
+                get_archive().extract(member, destination)
+        if on_progress is not None:
+            with progress_lock:
+                done += member.file_size
+                on_progress(done, total)
+
+    try:
+        max_workers: int = workers or min(8, os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for _ in executor.map(worker, members): pass
+    finally:
+        for archive in opened_archives:
+            archive.close()
+
+
+def _extract_7z(source: Path, destination: Path, include: Optional[Callable[[str], bool]], skip_identical: bool, on_progress: Optional[Callable[[int, int], Any]]) -> None:
+    # 7z archives are usually solid, members can't be decompressed independently
+    with SevenZipFile(source, "r") as archive:
+        if include is None and not skip_identical:
+            for member in archive.list():
+                if not member.is_directory: _unlink_existing(destination.joinpath(*member.filename.replace("\\", "/").split("/")), destination)
+            archive.extractall(destination)
+            if on_progress is not None:
+                total: int = archive.archiveinfo().uncompressed
+                on_progress(total, total)
+            return
+
+        targets: list[str] = []
+        total = 0
+        for member in archive.list():
+            name: str = member.filename.replace("\\", "/")
+            if include is not None and not member.is_directory and not include(name):
+                continue
+            if skip_identical and not member.is_directory and _is_identical(destination.joinpath(*name.split("/")), destination, member.uncompressed, member.crc32):
+                continue
+            if not member.is_directory: _unlink_existing(destination.joinpath(*name.split("/")), destination)
+            targets.append(member.filename)
+            total += member.uncompressed or 0
 
-        case other: raise ValueError(f"Unsupported filetype: {other}")
\ No newline at end of file
+        if targets:
+            archive.extract(destination, targets=targets)
+        if on_progress is not None:
+            on_progress(total, total)
\ No newline at end of file
@@ -0,0 +1,224 @@
+from pathlib import Path
+from typing import Optional, Callable, Any
+from threading import Thread, Event
+import ctypes
+import select
+import struct
+import time
+import os
+
+from modules.logger import Logger
+
+
+class _PollingBackend:
+    """Fallback, compares the stat signature of each path"""
+    _paths: list[Path]
+    _signatures: list[Optional[tuple[int, int]]]
+    _interval: float
+
+
+    def __init__(self, paths: list[Path], interval: float) -> None:
+        self._paths = paths
+        self._interval = interval
+        self._signatures = self._get_signatures()
+
+
+    def _get_signatures(self) -> list[Optional[tuple[int, int]]]:
+        signatures: list[Optional[tuple[int, int]]] = []
+        for path in self._paths:
+            try:
+                stat: os.stat_result = path.stat()
+                signatures.append((stat.st_mtime_ns, stat.st_size))
+            except OSError: signatures.append(None)
+        return signatures
+
+
+    def wait(self, timeout: float) -> bool:
+        deadline: float = time.monotonic() + timeout
+        while True:
+            signatures: list[Optional[tuple[int, int]]] = self._get_signatures()
+            if signatures != self._signatures:
+                self._signatures = signatures
+                return True
+            remaining: float = deadline - time.monotonic()
+            if remaining <= 0: return False
+            time.sleep(min(self._interval, remaining))
+
+
+    def close(self) -> None: pass
+
+
+class _InotifyBackend:
+    """Linux"""
+    _fd: int
+    _watches: dict[int, Optional[set[str]]]  # Watch descriptor: filenames of interest, None for any change
+
+    _MASK: int = 0x2 | 0x4 | 0x8 | 0x40 | 0x80 | 0x100 | 0x200 | 0x400 | 0x800  # MODIFY, ATTRIB, CLOSE_WRITE, MOVED_FROM, MOVED_TO, CREATE, DELETE, DELETE_SELF, MOVE_SELF
+    _IN_IGNORED: int = 0x8000
+    _EVENT_HEADER: struct.Struct = struct.Struct("iIII")
+
+
+    def __init__(self, directories: dict[Path, Optional[set[str]]]) -> None:
+        if not hasattr(os, "O_CLOEXEC"): raise OSError("inotify is not available")
+        libc = ctypes.CDLL(None, use_errno=True)
+        if not hasattr(libc, "inotify_init1"): raise OSError("inotify is not available")
+
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0: raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._watches = {}
+        for directory, names in directories.items():
+            watch_descriptor: int = libc.inotify_add_watch(self._fd, os.fsencode(directory), self._MASK)
+            if watch_descriptor < 0:
+                self.close()
+                raise OSError(ctypes.get_errno(), f"inotify_add_watch failed: {directory}")
+            self._watches[watch_descriptor] = names
+
+
+    def wait(self, timeout: float) -> bool:
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable: return False
+        try: data: bytes = os.read(self._fd, 64 * 1024)
+        except BlockingIOError: return False
+
+        changed: bool = False
+        offset: int = 0
+        while offset < len(data):
+            watch_descriptor, mask, _, length = self._EVENT_HEADER.unpack_from(data, offset)
+            offset += self._EVENT_HEADER.size
+            name: str = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+
+            if mask & self._IN_IGNORED: raise OSError("Watched directory was removed")
+            names: Optional[set[str]] = self._watches.get(watch_descriptor)
+            if names is None or name in names: changed = True
+        return changed
+
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class _WindowsBackend:
+    """Windows, change notifications don't say which file changed, so filenames can't be filtered"""
+    _handles: list[int]
+
+    _FILTER: int = 0x1 | 0x2 | 0x8 | 0x10  # FILE_NAME, DIR_NAME, SIZE, LAST_WRITE
+    _INVALID_HANDLE_VALUE: int = ctypes.c_void_p(-1).value  # type: ignore
+    _WAIT_OBJECT_0: int = 0x0
+    _WAIT_TIMEOUT: int = 0x102
+
+
+    def __init__(self, directories: dict[Path, Optional[set[str]]]) -> None:
+        if os.name != "nt": raise OSError("Change notifications are only available on Windows")
+        self._kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)  # type: ignore
+        self._kernel32.FindFirstChangeNotificationW.restype = ctypes.c_void_p
+        self._kernel32.FindFirstChangeNotificationW.argtypes = [ctypes.c_wchar_p, ctypes.c_int, ctypes.c_uint32]
+        self._kernel32.FindNextChangeNotification.argtypes = [ctypes.c_void_p]
+        self._kernel32.FindCloseChangeNotification.argtypes = [ctypes.c_void_p]
+        self._kernel32.WaitForMultipleObjects.argtypes = [ctypes.c_uint32, ctypes.POINTER(ctypes.c_void_p), ctypes.c_int, ctypes.c_uint32]
+        self._kernel32.WaitForMultipleObjects.restype = ctypes.c_uint32
+
+        self._handles = []
+        for directory in directories:
+            handle: int | None = self._kernel32.FindFirstChangeNotificationW(str(directory), False, self._FILTER)
+            if handle is None or handle == self._INVALID_HANDLE_VALUE:
+                self.close()
+                raise ctypes.WinError(ctypes.get_last_error())  # type: ignore
+            self._handles.append(handle)
+
+
+    def wait(self, timeout: float) -> bool:
+        handles = (ctypes.c_void_p * len(self._handles))(*self._handles)
+        result: int = self._kernel32.WaitForMultipleObjects(len(self._handles), handles, False, int(timeout * 1000))
+        if result == self._WAIT_TIMEOUT: return False
+        index: int = result - self._WAIT_OBJECT_0
+        if not 0 <= index < len(self._handles): raise ctypes.WinError(ctypes.get_last_error())  # type: ignore
+        self._kernel32.FindNextChangeNotification(self._handles[index])
+        return True
+
+
+    def close(self) -> None:
+        for handle in self._handles:
+            self._kernel32.FindCloseChangeNotification(handle)
+        self._handles = []
+
+
+class FileWatcher:
+    """Calls callback from a background thread once changes to the watched files/directories settle. Directories are not watched recursively"""
+    paths: list[Path]
+    callback: Callable[[], Any]
+    debounce: float
+    poll_interval: float
+
+    _thread: Optional[Thread] = None
+    _stop_event: Event
+
+    _STOP_CHECK_INTERVAL: float = 0.5
+    _LOG_PREFIX: str = "FileWatcher"
+
+
+    def __init__(self, paths: list[Path], callback: Callable[[], Any], debounce: float = 0.2, poll_interval: float = 1) -> None:
+        self.paths = [Path(path).resolve() for path in paths]
+        self.callback = callback
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self._stop_event = Event()
+
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+
+    def start(self) -> None:
+        if self.running: return
+        self._stop_event = Event()
+        self._thread = Thread(target=self._run, args=(self._stop_event,), daemon=True)
+        self._thread.start()
+
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self._thread = None
+
+
+    def _get_directories(self) -> dict[Path, Optional[set[str]]]:
+        directories: dict[Path, Optional[set[str]]] = {}
+        for path in self.paths:
+            if path.is_dir():
+                directories[path] = None
+                continue
+            names: Optional[set[str]] = directories.setdefault(path.parent, set())
+            if names is not None: names.add(path.name)
+        return directories
+
+
+    def _create_backend(self) -> _PollingBackend | _InotifyBackend | _WindowsBackend:
+        directories: dict[Path, Optional[set[str]]] = self._get_directories()
+        if all(directory.is_dir() for directory in directories):
+            for backend in (_WindowsBackend, _InotifyBackend):
+                try: return backend(directories)
+                except (OSError, AttributeError): continue
+        Logger.info("Native change notifications unavailable, polling instead", prefix=self._LOG_PREFIX)
+        return _PollingBackend(self.paths, self.poll_interval)
+
+
+    def _run(self, stop_event: Event) -> None:
+        backend: _PollingBackend | _InotifyBackend | _WindowsBackend = self._create_backend()
+        try:
+            while not stop_event.is_set():
+                try:
+                    if not backend.wait(self._STOP_CHECK_INTERVAL): continue
+                    while not stop_event.is_set() and backend.wait(self.debounce): pass  # Wait until changes settle
+                except OSError as e:
+                    Logger.warning(f"Watcher failed, falling back to polling. {type(e).__name__}: {e}", prefix=self._LOG_PREFIX)
+                    backend.close()
+                    backend = _PollingBackend(self.paths, self.poll_interval)
+                if stop_event.is_set(): break
+
+                try: self.callback()
+                except Exception as e: Logger.error(f"Callback failed! {type(e).__name__}: {e}", prefix=self._LOG_PREFIX)
+        finally:
+            backend.close()
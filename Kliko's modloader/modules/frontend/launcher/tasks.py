@@ -8,11 +8,12 @@ import ctypes
 import shutil
 import hashlib
 import json
+import os
 
 from modules.logger import Logger
 from modules.project_data import ProjectData
 from modules.localization import Localizer
-from modules.interfaces.config import ConfigInterface
+from modules.interfaces.config import ConfigInterface, ConfigSnapshot
 from modules.interfaces.data import DataInterface
 from modules.interfaces.mod_manager import Mod, ModManager
 from modules.interfaces.fastflag_manager import FastFlagProfile, FastFlagManager
@@ -22,6 +23,7 @@ from modules.deployments import LatestVersion, Package, PackageManifest
 from modules.networking import requests, Response, Api
 from modules.filesystem import Directories
 from modules.mod_updater import ModUpdater
+from modules.mod_deployer import DeploymentManifest, DeployedFile, PristineStore
 from modules import filesystem
 
 
@@ -34,6 +36,7 @@ MOD_DEPLOY_END_PROGRESS: float = 0.90
 FASTFLAG_DEPLOY_END_PROGRESS: float = 0.92
 CUSTOM_INTEGRATIONS_END_PROGRESS: float = 0.95
 LAUNCH_END_PROGRESS: float = 1
+FONT_MOD_NAME: str = "<custom font>"  # Marks the font families patched by apply_font_mod() in the deployment manifest, can't be a mod name
 
 APPSETTINGS: str = """<?xml version="1.0" encoding="UTF-8"?>
 <Settings>
@@ -45,6 +48,7 @@ class Config(NamedTuple):
     confirm_launch: bool
     force_reinstall: bool
     disable_mods: bool
+    hardlink_mods: bool
     disable_fastflags: bool
     static_version_folder: bool
     use_roblox_version_folder: bool
@@ -73,21 +77,12 @@ def run(mode: Literal["Player", "Studio"], deeplink: str, stop_event: Event, on_
 
         # Settings & Data
         Logger.info("Getting config...", prefix=LOG_PREFIX)
-        confirm_launch: bool = ConfigInterface.get("confirm_launch")
-        force_reinstall: bool = ConfigInterface.get("force_reinstall")
-        if force_reinstall: ConfigInterface.set("force_reinstall", False)
-        disable_mods: bool = ConfigInterface.get("disable_mods")
-        disable_fastflags: bool = ConfigInterface.get("disable_fastflags")
-        static_version_folder: bool = ConfigInterface.get("static_version_folder")
-        use_roblox_version_folder: bool = ConfigInterface.get("use_roblox_version_folder")
-
-        mod_updates: bool = ConfigInterface.get("mod_updates")
-        multi_instance_launching: bool = ConfigInterface.get("multi_instance_launching")
-        discord_rpc: bool = ConfigInterface.get("discord_rpc")
+        settings: ConfigSnapshot = ConfigInterface.snapshot()
+        if settings.force_reinstall: ConfigInterface.set("force_reinstall", False)
 
         installed_version: str = DataInterface.get_installed_version(mode)
         loaded_mods: list[str] = DataInterface.get_loaded_mods(mode)
-        config: Config = Config(confirm_launch, force_reinstall, disable_mods, disable_fastflags, static_version_folder, use_roblox_version_folder, mod_updates, multi_instance_launching, discord_rpc, installed_version, loaded_mods)
+        config: Config = Config(settings.confirm_launch, settings.force_reinstall, settings.disable_mods, settings.hardlink_mods, settings.disable_fastflags, settings.static_version_folder, settings.use_roblox_version_folder, settings.mod_updates, settings.multi_instance_launching, settings.discord_rpc, installed_version, loaded_mods)
 
 
         if config.disable_mods:
@@ -187,22 +182,21 @@ def run(mode: Literal["Player", "Studio"], deeplink: str, stop_event: Event, on_
 
             Logger.info("Deploying mods...", prefix=LOG_PREFIX)
             functions.set_status_label("launcher.progress.deploying_mods")
-            ModManager.deploy_mods(version_folder, mods)  # type: ignore
+            ModManager.deploy_mods(version_folder, mods, link=config.hardlink_mods)  # type: ignore
             DataInterface.set_loaded_mods(mode=mode, value=mod_names)
 
             # Font mods
             Logger.info("Checking for font mods...")
             font_dir: Path = version_folder / "content" / "fonts"
-            font_families_dir: Path = font_dir / "families"
             font_target: Path = font_dir / "CustomFont.ttf"
             if font_target.exists():
                 Logger.info(f"Applying custom font: '{font_target.name}'...")
-                apply_font_mod(font_target, font_families_dir)
+                apply_font_mod(version_folder, font_target)
             else:
                 font_target = font_target.with_suffix(".otf")
                 if font_target.exists():
                     Logger.info(f"Applying custom font: '{font_target.name}'...")
-                    apply_font_mod(font_target, font_families_dir)
+                    apply_font_mod(version_folder, font_target)
                 else:
                     Logger.info("No custom font found!")
 
@@ -344,7 +338,10 @@ def update_roblox(mode: Literal["Player", "Studio"], config: Config, functions:
             return
 
     # Extract files to version folder
+    # Roblox's own version folder is installed over after undoing the deployment, only folders created by the modloader are removed
     Logger.info("Installing Roblox...")
+    if config.use_roblox_version_folder: undo_deployment(version_folder)
+    elif version_folder.exists(): shutil.rmtree(version_folder)
     version_folder.mkdir(parents=True, exist_ok=True)
     for package in package_manifest.packages:
         source: Path = Directories.VERSIONS_CACHE / mode / package.md5
@@ -396,25 +393,65 @@ def create_singleton_mutexes() -> None:
             Logger.warning(f"Mutex already exists: {mutex_name}", prefix=LOG_PREFIX)
 
 
-def apply_font_mod(font_target: Path, font_families_dir: Path) -> None:
+def undo_deployment(version_folder: Path) -> None:
+    """Restores the originals of deployed files and removes the files that were added by mods. Files in a folder without a manifest are left as they are"""
+
+    manifest: DeploymentManifest = DeploymentManifest.load(version_folder)
+    for deployed_file in manifest.files.values():
+        target: Path = version_folder / deployed_file.member
+        try:
+            if deployed_file.pristine is not None: PristineStore.restore(version_folder, deployed_file.pristine, target)
+            else: target.unlink(missing_ok=True)
+        except OSError as e:
+            Logger.warning(f"Unable to undo deployed file: '{deployed_file.member}'. {type(e).__name__}: {e}", prefix=LOG_PREFIX)
+    PristineStore.cleanup(version_folder, set())
+    DeploymentManifest.delete(version_folder)
+
+
+def apply_font_mod(version_folder: Path, font_target: Path) -> None:
+    """
+    Patched font families are recorded in the deployment manifest, with their originals in the PristineStore.
+    They aren't part of any mod, so the next deployment with different mods restores them, after which they are patched again if the font is still there.
+    """
+
+    font_families_dir: Path = version_folder / "content" / "fonts" / "families"
     if not font_families_dir.is_dir():
         Logger.warning(f"Unable to apply custom font! Directory not found: {font_families_dir.name}")
-    
+        return
+
+    manifest: DeploymentManifest = DeploymentManifest.load(version_folder)
+    new_asset_id: str = f"rbxasset://fonts/{font_target.name}"
+    modified: bool = False
     for path in font_families_dir.iterdir():
         if not path.is_file():
             continue
         if path.suffix != ".json":
             continue
 
+        member: str = path.relative_to(version_folder).as_posix()
+        key: str = member.lower()
+        deployed_file: DeployedFile | None = manifest.files.get(key)
+        if deployed_file is not None and deployed_file.mod == FONT_MOD_NAME and manifest.is_file_current(key, version_folder):
+            continue
+
         try:
-            new_asset_id: str = f"rbxasset://fonts/{font_target.name}"
             with open(path) as file:
                 data: dict = json.load(file)
             for face in data["faces"]:
                 face["assetId"] = new_asset_id
+
+            # A family deployed by a mod already has its original (if any) in the PristineStore
+            pristine: str | None = deployed_file.pristine if deployed_file is not None else PristineStore.save(version_folder, path)
+            manifest.files[key] = DeployedFile(member, FONT_MOD_NAME, -1, -1, pristine)  # Recorded before writing, so the original isn't lost if writing fails
+            modified = True
+            path.unlink(missing_ok=True)  # Don't write through a hard link into the mod store
             with open(path, "w") as file:
                 json.dump(data, file, indent=4)
+            stat: os.stat_result = path.stat()
+            manifest.files[key] = DeployedFile(member, FONT_MOD_NAME, stat.st_size, stat.st_mtime_ns, pristine)
 
         except Exception as e:
             Logger.warning(f"Unable to overwrite font: '{path.name}'. {type(e).__name__}: {e}")
+
+    if modified: manifest.save(version_folder)
 # endregion
\ No newline at end of file
@@ -10,6 +10,7 @@ from modules.localization import Localizer
 from modules.logger import Logger
 from modules.frontend.widgets import Root, Frame, Label, Button
 from modules.filesystem import Resources
+from modules.backend import ConfigEditor
 from modules.interfaces.config import ConfigInterface
 from modules.networking import requests, Response, Api
 from modules.frontend.functions import get_ctk_image
@@ -205,4 +206,5 @@ class App(Root):
                 ):
                     Logger.info("User chose to update!", prefix="App")
                     webbrowser.open_new_tab(ProjectData.LATEST_RELEASE)
+                    ConfigEditor.flush_all()  # os._exit skips atexit handlers
                     os._exit(os.EX_OK)
\ No newline at end of file
@@ -1,4 +1,5 @@
 from typing import Optional
+from concurrent.futures import ThreadPoolExecutor, Future
 from pathlib import Path
 from io import BytesIO
 import time
@@ -7,7 +8,7 @@ import hashlib
 
 from modules.logger import Logger
 from modules.filesystem import Files, Directories
-from modules.networking import requests, Response, Api
+from modules.networking import requests, Response, RobloxMetadata, GameInfo
 
 from PIL import Image  # type: ignore
 
@@ -27,27 +28,44 @@ class Shortcut:
     _LOG_PREFIX: str = "Shortcut"
 
 
-    def __init__(self, universe_id: str | int, placeholder_thumbnail: tuple[Image.Image, Image.Image]):
+    def __init__(self, universe_id: str | int, placeholder_thumbnail: tuple[Image.Image, Image.Image], game_info: Optional[GameInfo] = None, thumbnail_url: Optional[str] = None):
+        """Game info is looked up if it isn't given"""
+
         if isinstance(universe_id, int): universe_id = str(universe_id)
         self.universe_id = universe_id
         self._thumbnail_placeholder = placeholder_thumbnail
-        self.set_game_info()
+        if game_info is None:
+            self.set_game_info()
+            return
+        self.name = game_info.name
+        self.creator = game_info.creator
+        self.place_id = game_info.root_place_id
+        self.thumbnail_url = thumbnail_url or ""
+
+
+    @classmethod
+    def load_many(cls, universe_ids: list[str], placeholder_thumbnail: tuple[Image.Image, Image.Image]) -> dict[str, "Shortcut"]:
+        """Looks up all games with as few requests as possible, unknown games are left out"""
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            games_future: Future = executor.submit(RobloxMetadata.get_games, universe_ids)
+            thumbnails_future: Future = executor.submit(RobloxMetadata.get_game_thumbnails, universe_ids)
+        games: dict[str, GameInfo] = games_future.result()
+        thumbnails: dict[str, str] = thumbnails_future.result()
+        return {
+            universe_id: cls(universe_id, placeholder_thumbnail, game_info=games[universe_id], thumbnail_url=thumbnails.get(universe_id))
+            for universe_id in universe_ids if universe_id in games
+        }
 
 
 # region game info
     def set_game_info(self) -> None:
-        response = requests.get(Api.Roblox.Activity.game(self.universe_id))
-        data = response.json()
-        actual_data = data["data"][0]
-        self.name = actual_data["name"]
-        self.creator = actual_data["creator"]["name"]
-        self.place_id = actual_data["rootPlaceId"]
-        if isinstance(self.place_id, int): self.place_id = str(self.place_id)
-
-        response = requests.get(Api.Roblox.Activity.thumbnail(self.universe_id))
-        data = response.json()
-        actual_data = data["data"][0]
-        self.thumbnail_url = actual_data["imageUrl"]
+        game: GameInfo | None = RobloxMetadata.get_games([self.universe_id]).get(self.universe_id)
+        if game is None: raise KeyError(f"Game not found: {self.universe_id}")
+        self.name = game.name
+        self.creator = game.creator
+        self.place_id = game.root_place_id
+        self.thumbnail_url = RobloxMetadata.get_game_thumbnails([self.universe_id]).get(self.universe_id, "")
 # endregion
 
 
@@ -9,7 +9,7 @@ from modules.frontend.widgets import ScrollableFrame, Frame, Label, Button, Entr
 from modules.frontend.functions import get_ctk_image
 from modules.interfaces.mod_manager import Mod, ModManager
 from modules.localization import Localizer
-from modules.filesystem import Resources, Directories, EmptyFileNameError, InvalidFileNameError, ReservedFileNameError, TrailingDotError
+from modules.filesystem import Resources, Directories, FileWatcher, EmptyFileNameError, InvalidFileNameError, ReservedFileNameError, TrailingDotError
 from modules import filesystem
 
 if TYPE_CHECKING: from modules.frontend.widgets import Root
@@ -25,10 +25,14 @@ class ModsSection(ScrollableFrame):
     _frames: dict[str, tuple[Mod, Frame]]
     _mod_list: Frame
     _language_change_callback_id: str | None = None
+    _watcher: FileWatcher | None = None
+    _watcher_poll_id: str | None = None
+    _mods_changed: bool = False  # Set from the watcher thread, handled on the main thread by _poll_watcher()
 
     _SECTION_PADX: int | tuple[int, int] = (8, 4)
     _SECTION_PADY: int | tuple[int, int] = 8
     _BACKGROUND_TASK_INTERVAL: int = 50
+    _WATCHER_POLL_INTERVAL: int = 250
     _ENTRY_GAP: int = 4
     _ENTRY_PADDING: tuple[int , int] = (16, 16)
     _ENTRY_INNER_GAP: int = 16
@@ -45,6 +49,7 @@ class ModsSection(ScrollableFrame):
         if self._language_change_callback_id is not None:
             Localizer.remove_callback(self._language_change_callback_id)
             self._language_change_callback_id = None
+        self._stop_watcher()
         return super().destroy()
 
 
@@ -52,6 +57,7 @@ class ModsSection(ScrollableFrame):
         if self._language_change_callback_id is not None:
             Localizer.remove_callback(self._language_change_callback_id)
             self._language_change_callback_id = None
+        self._stop_watcher()
         for widget in self.winfo_children():
             try: widget.destroy()
             except TclError: pass
@@ -65,6 +71,10 @@ class ModsSection(ScrollableFrame):
 
     def show(self) -> None:
         self.load()
+        if self._watcher is None:
+            self._watcher = FileWatcher([ModManager.DIRECTORY, ModManager.CONFIG_PATH], callback=self._on_mods_changed)
+        self._watcher.start()
+        if self._watcher_poll_id is None: self._watcher_poll_id = self.after(self._WATCHER_POLL_INTERVAL, self._poll_watcher)
         self._run_when_mapped(self._run_background_tasks)
 
 
@@ -134,11 +144,33 @@ class ModsSection(ScrollableFrame):
 
 
 # region background tasks
+    def _on_mods_changed(self) -> None:
+        """Called from the watcher thread, Tk may only be used from the main thread"""
+
+        self._mods_changed = True
+
+
+    def _poll_watcher(self) -> None:
+        self._watcher_poll_id = self.after(self._WATCHER_POLL_INTERVAL, self._poll_watcher)
+        if not self._mods_changed: return
+        self._mods_changed = False
+        self._run_background_tasks()
+
+
+    def _stop_watcher(self) -> None:
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+        if self._watcher_poll_id is not None:
+            self.after_cancel(self._watcher_poll_id)
+            self._watcher_poll_id = None
+        self._mods_changed = False
+
+
     def _run_background_tasks(self) -> None:
-        if not self.loaded: return
+        if not self.loaded or not self.winfo_exists(): return
         self.update_idletasks()
-        if not self.winfo_ismapped(): return
-        self.after(self._BACKGROUND_TASK_INTERVAL, self._run_background_tasks)
+        if not self.winfo_ismapped(): return  # show() updates the list once the section is shown again
 
         mods: list[Mod] = ModManager.get_all(sort="name")
         names: list[str] = [mod.name for mod in mods]
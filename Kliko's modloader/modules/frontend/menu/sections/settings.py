@@ -247,6 +247,18 @@ class SettingsSection(ScrollableFrame):
         ToggleSwitch(frame, variable=switch_var, command=lambda var=switch_var: self._update_boolean_setting("disable_mods", var.get(), "menu.settings.content.disable_mods.title")).grid(column=1, row=0, rowspan=2, sticky="e", pady=self._ENTRY_PADDING[1], padx=(self._ENTRY_INNER_GAP, self._ENTRY_PADDING[0]))
 
 
+        # Hard-link mods
+        row_counter += 1
+        frame = Frame(wrapper, layer=2)
+        frame.grid_columnconfigure(0, weight=1)
+        frame.grid(column=0, row=row_counter, sticky="nsew", pady=0 if row_counter == 0 else (self._ENTRY_GAP, 0))
+        Label(frame, "menu.settings.content.hardlink_mods.title", style="body_strong", autowrap=True).grid(column=0, row=0, sticky="sew", pady=(self._ENTRY_PADDING[1], 0), padx=(self._ENTRY_PADDING[0], 0))
+        Label(frame, "menu.settings.content.hardlink_mods.description", style="caption", autowrap=True).grid(column=0, row=1, sticky="new", pady=(0, self._ENTRY_PADDING[1]), padx=(self._ENTRY_PADDING[0], 0))
+        value = ConfigInterface.get("hardlink_mods")
+        switch_var = BooleanVar(value=value)
+        ToggleSwitch(frame, variable=switch_var, command=lambda var=switch_var: self._update_boolean_setting("hardlink_mods", var.get(), "menu.settings.content.hardlink_mods.title")).grid(column=1, row=0, rowspan=2, sticky="e", pady=self._ENTRY_PADDING[1], padx=(self._ENTRY_INNER_GAP, self._ENTRY_PADDING[0]))
+
+
         # Disable FastFlags
         row_counter += 1
         frame = Frame(wrapper, layer=2)
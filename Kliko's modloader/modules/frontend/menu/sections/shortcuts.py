@@ -1,5 +1,6 @@
 from tkinter import TclError
 from threading import Thread
+from concurrent.futures import ThreadPoolExecutor, Future
 from typing import TYPE_CHECKING
 from pathlib import Path
 
@@ -12,7 +13,7 @@ from modules.frontend.menu.windows import ShortcutToDesktopWindow
 from modules.localization import Localizer
 from modules.filesystem import Resources, Directories
 from modules.interfaces.shortcuts import ShortcutsInterface
-from modules.networking import requests, Response, Api, RequestException
+from modules.networking import RobloxMetadata, RequestException
 
 if TYPE_CHECKING: from modules.frontend.widgets import Root
 
@@ -32,6 +33,7 @@ class ShortcutsSection(ScrollableFrame):
 
     placeholder_thumbnail: tuple[Image.Image, Image.Image]
     THUMBNAIL_SIZE: int = 144
+    _MAX_THUMBNAIL_WORKERS: int = 4
 
     _SECTION_PADX: int | tuple[int, int] = (8, 4)
     _SECTION_PADY: int | tuple[int, int] = 8
@@ -137,6 +139,7 @@ class ShortcutsSection(ScrollableFrame):
                 self._shortcuts.pop(shortcut_id, None)
                 frame.destroy()
 
+        new_frames: dict[str, Frame] = {}
         for i, shortcut_id in enumerate(shortcut_ids):
             column: int = i % columns
             row: int = i // columns
@@ -158,11 +161,28 @@ class ShortcutsSection(ScrollableFrame):
                 frame.grid(column=column, row=row, sticky="nw", padx=padx, pady=pady)
                 self._frames[shortcut_id] = frame
                 self._shortcuts.pop(shortcut_id, None)
-                Thread(target=self.load_shortcut_frame_async, args=(frame, shortcut_id), daemon=True).start()
+                new_frames[shortcut_id] = frame
+
+        if new_frames: Thread(target=self.load_shortcut_frames_async, args=(new_frames,), daemon=True).start()
 
 
 # region frame
-    def load_shortcut_frame_async(self, frame: Frame, shortcut_id: str) -> None:
+    def load_shortcut_frames_async(self, frames: dict[str, Frame]) -> None:
+        """Game info is looked up in batches, thumbnails are loaded concurrently"""
+
+        try: shortcuts: dict[str, Shortcut] = Shortcut.load_many(list(frames), self.placeholder_thumbnail)
+        except Exception as e:
+            Logger.error(f"Failed to load shortcuts! {type(e).__name__}: {e}")
+            return
+
+        with ThreadPoolExecutor(max_workers=self._MAX_THUMBNAIL_WORKERS) as executor:
+            futures: list[Future] = [executor.submit(self.load_shortcut_frame_async, frames[shortcut_id], shortcut) for shortcut_id, shortcut in shortcuts.items()]
+        for future in futures:
+            exception: BaseException | None = future.exception()
+            if exception is not None: Logger.error(f"Failed to load shortcut! {type(exception).__name__}: {exception}")
+
+
+    def load_shortcut_frame_async(self, frame: Frame, shortcut: Shortcut) -> None:
         def load_content_sync(frame: Frame, shortcut: Shortcut, thumbnail: CTkImage) -> None:
             wrapper: Frame = Frame(frame, transparent=True)
             wrapper.grid(column=0, row=0, sticky="nsew", padx=self._ENTRY_PADDING[0], pady=self._ENTRY_PADDING[1])
@@ -176,8 +196,7 @@ class ShortcutsSection(ScrollableFrame):
             bin_image = get_ctk_image(Resources.Common.Light.BIN, Resources.Common.Dark.BIN, 24)
             Button(wrapper, secondary=True, image=bin_image, width=32, command=lambda shortcut=shortcut: self.remove_shortcut(shortcut.universe_id), corner_radius=0).grid(column=0, row=0, sticky="ne")
 
-        shortcut: Shortcut = Shortcut(shortcut_id, self.placeholder_thumbnail)
-        self._shortcuts[shortcut_id] = shortcut
+        self._shortcuts[shortcut.universe_id] = shortcut
         thumbnail: Image.Image | tuple[Image.Image, Image.Image] = shortcut.get_thumbnail()
         thumbnail_ctk = get_ctk_image(thumbnail[0], thumbnail[1], size=self.THUMBNAIL_SIZE) if isinstance(thumbnail, tuple) else get_ctk_image(thumbnail, size=self.THUMBNAIL_SIZE)
         self.after(10, load_content_sync, frame, shortcut, thumbnail_ctk)
@@ -229,10 +248,7 @@ class ShortcutsSection(ScrollableFrame):
             )
             return
 
-        try:
-            response: Response = requests.get(Api.Roblox.Activity.universe_id(place_id))
-            data: dict = response.json()
-            universe_id: int | None = data["universeId"]
+        try: universe_id: str | None = RobloxMetadata.get_universe_id(place_id)
         except (RequestException, RuntimeError):
             self.root.send_banner(
                 title_key="menu.shortcuts.exception.title.failed_to_add",
@@ -249,7 +265,7 @@ class ShortcutsSection(ScrollableFrame):
             )
             return
 
-        ShortcutsInterface.add(str(universe_id))
+        ShortcutsInterface.add(universe_id)
         self._update_frames()
 
 
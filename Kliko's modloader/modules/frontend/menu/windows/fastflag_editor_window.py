@@ -1,35 +1,61 @@
 from pathlib import Path
-from typing import Literal, TYPE_CHECKING
+from typing import Literal, Any, Optional, TYPE_CHECKING
 from tkinter import messagebox, filedialog
 import json
 
 from modules.project_data import ProjectData
 from modules.localization import Localizer
 from modules.filesystem import Resources, Directories
-from modules.frontend.widgets import Toplevel, Frame, Label, Button, Textbox
+from modules.frontend.widgets import Toplevel, Frame, Label, Button, Entry
 if TYPE_CHECKING: from modules.frontend.widgets import Root
 from modules.frontend.functions import get_ctk_image
 from modules.interfaces.fastflag_manager import FastFlagProfile
 
 import pyperclip  # type: ignore
-from customtkinter import CTkImage, ScalingTracker  # type: ignore
+from customtkinter import CTkImage, ScalingTracker, CTkScrollbar  # type: ignore
+
+
+class _FlagRow:
+    """One of the reused rows, shows whichever flag is at its position in the current view"""
+    frame: Frame
+    name_entry: Entry
+    value_entry: Entry
+    name: Optional[str] = None
 
 
 class FastFlagEditorWindow(Toplevel):
     root: "Root"
     profile: FastFlagProfile
     profile_name_label: Label
-    data_textbox: Textbox
+    search_entry: Entry
+    new_name_entry: Entry
+    new_value_entry: Entry
+    count_label: Label
+    scrollbar: CTkScrollbar
 
     _localizer_callback_id: str | None = None
     _profile_name: str
 
+    # Only ROW_COUNT rows are created, scrolling changes which flags they show
+    _data: dict[str, Any]
+    _names: list[str]
+    _search_index: dict[str, str]  # Name: lowercase name
+    _view: list[str]
+    _offset: int = 0
+    _query: str = ""
+    _rows: list[_FlagRow]
+    _search_after_id: str | None = None
+    _save_after_id: str | None = None
+
     PADDING: tuple[int, int] = (16, 16)
-    TEXTBOX_HEIGHT: int = 256
-    WINDOW_MIN_WIDTH: int = 512
+    ROW_COUNT: int = 10
+    ROW_GAP: int = 4
+    WINDOW_MIN_WIDTH: int = 640
 
     _LOG_PREFIX: str = "FastFlagEditor"
     _BACKGROUND_TASK_INTERVAL: int = 1000  # ms
+    _SEARCH_DELAY: int = 150  # ms
+    _SAVE_DELAY: int = 500  # ms
 
 
     def __init__(self, master: "Root", profile: FastFlagProfile):
@@ -41,6 +67,7 @@ class FastFlagEditorWindow(Toplevel):
         self.root = master
         self.profile = profile
         self._profile_name = self.profile.name
+        self._load_data(self.profile.data)
 
         content: Frame = Frame(self, transparent=True)
         content.grid_columnconfigure(0, weight=1)
@@ -59,11 +86,13 @@ class FastFlagEditorWindow(Toplevel):
         self.after(200, self.focus)
         ScalingTracker.add_window(self._on_scaling_change, self)
         self._localizer_callback_id = Localizer.add_callback(self._on_language_change)
+        self.bind("<MouseWheel>", self._on_mouse_wheel)
         self.after(self._BACKGROUND_TASK_INTERVAL, self._run_background_tasks)
 
 
     def destroy(self):
         if self._localizer_callback_id is not None: Localizer.remove_callback(self._localizer_callback_id)
+        if self._save_after_id is not None: self._save()
         return super().destroy()
 
 
@@ -132,13 +161,239 @@ class FastFlagEditorWindow(Toplevel):
         # Body
         body: Frame = Frame(frame, transparent=True)
         body.grid_columnconfigure(0, weight=1)
-        body.grid_rowconfigure(0, weight=1)
         body.grid(column=0, row=1, sticky="nsew", pady=(12, 0))
 
-        self.data_textbox = Textbox(body, command=self._save_data, on_focus_lost="command", run_command_if_empty=False, reset_if_empty=True, height=self.TEXTBOX_HEIGHT)
-        data_string: str = json.dumps(self.profile.data, indent=4)
-        self.data_textbox.set(data_string)
-        self.data_textbox.grid(column=0, row=0, sticky="ew")
+        self.search_entry = Entry(body, placeholder_key="menu.fastflags.fastflag_editor.search.placeholder")
+        self.search_entry.grid(column=0, row=0, sticky="ew")
+        self.search_entry.bind("<KeyRelease>", self._on_search_input)
+
+        new_flag: Frame = Frame(body, transparent=True)
+        new_flag.grid_columnconfigure(1, weight=1)
+        new_flag.grid(column=0, row=1, sticky="ew", pady=(8, 0))
+        self.new_name_entry = Entry(new_flag, placeholder_key="menu.fastflags.fastflag_editor.new_flag.name.placeholder", width=256)
+        self.new_name_entry.grid(column=0, row=0, sticky="w")
+        self.new_value_entry = Entry(new_flag, command=lambda _: self._add_flag(), placeholder_key="menu.fastflags.fastflag_editor.new_flag.value.placeholder")
+        self.new_value_entry.grid(column=1, row=0, sticky="ew", padx=(8, 0))
+        add_image: CTkImage = get_ctk_image(Resources.Common.Light.ADD, Resources.Common.Dark.ADD, size=20)
+        Button(new_flag, "menu.fastflags.fastflag_editor.button.add", secondary=True, height=32, image=add_image, command=self._add_flag).grid(column=2, row=0, padx=(8, 0))
+
+        flag_list: Frame = Frame(body, transparent=True)
+        flag_list.grid_columnconfigure(0, weight=1)
+        flag_list.grid(column=0, row=2, sticky="nsew", pady=(12, 0))
+        bin_image: CTkImage = get_ctk_image(Resources.Common.Light.BIN, Resources.Common.Dark.BIN, 20)
+        self._rows = []
+        for i in range(self.ROW_COUNT):
+            row: _FlagRow = _FlagRow()
+            row.frame = Frame(flag_list, transparent=True)
+            row.frame.grid_columnconfigure(2, weight=1)
+            row.frame.grid(column=0, row=i, sticky="ew", pady=0 if i == 0 else (self.ROW_GAP, 0))
+            Button(row.frame, secondary=True, width=32, height=32, image=bin_image, command=lambda row=row: self._delete_flag(row)).grid(column=0, row=0)
+            row.name_entry = Entry(row.frame, command=lambda event, row=row: self._rename_flag(row, event.value), on_focus_lost="command", reset_if_empty=True, width=256)
+            row.name_entry.grid(column=1, row=0, sticky="w", padx=(8, 0))
+            row.value_entry = Entry(row.frame, command=lambda event, row=row: self._set_flag_value(row, event.value), on_focus_lost="command", run_command_if_empty=True)
+            row.value_entry.grid(column=2, row=0, sticky="ew", padx=(8, 0))
+            self._rows.append(row)
+
+        self.scrollbar = CTkScrollbar(flag_list, orientation="vertical", command=self._on_scrollbar)
+        self.scrollbar.grid(column=1, row=0, rowspan=self.ROW_COUNT, sticky="ns", padx=(4, 0))
+
+        self.count_label = Label(body, "menu.fastflags.fastflag_editor.flag_count", style="caption")
+        self.count_label.grid(column=0, row=3, sticky="w", pady=(8, 0))
+        self._update_view()
+
+
+# region flag list
+    def _load_data(self, data: dict[str, Any]) -> None:
+        self._data = dict(data)
+        self._names = list(self._data)
+        self._search_index = {name: name.lower() for name in self._names}
+
+
+    def _update_view(self) -> None:
+        """Re-applies the search query, only scans the precomputed lowercase names"""
+
+        query: str = self._query
+        if query: self._view = [name for name in self._names if query in self._search_index[name]]
+        else: self._view = self._names
+        self._offset = max(0, min(self._offset, len(self._view) - self.ROW_COUNT))
+        self.count_label.configure(modification=lambda string: Localizer.format(string, {"{count}": str(len(self._view)), "{total}": str(len(self._names))}))
+        self._render()
+
+
+    def _render(self) -> None:
+        for i, row in enumerate(self._rows):
+            index: int = self._offset + i
+            if index >= len(self._view):
+                row.name = None
+                row.frame.grid_remove()
+                continue
+
+            name: str = self._view[index]
+            if row.name != name or row.value_entry.get() != self._format_value(self._data[name]):
+                row.name = name
+                row.name_entry.set(name)
+                row.value_entry.set(self._format_value(self._data[name]))
+            row.frame.grid()
+
+        total: int = len(self._view)
+        if total <= self.ROW_COUNT: self.scrollbar.set(0, 1)
+        else: self.scrollbar.set(self._offset / total, (self._offset + self.ROW_COUNT) / total)
+
+
+    def _commit_focused_row(self) -> None:
+        """Rows are reused when scrolling or searching, an edit that is still in progress is committed first so it isn't overwritten"""
+
+        for row in self._rows:
+            if row.name is None: continue
+            if row.value_entry.focused:
+                value: str = row.value_entry.get()
+                row.value_entry.last_value = value
+                self._set_flag_value(row, value)
+            if row.name_entry.focused and row.name_entry.get().strip():
+                value = row.name_entry.get()
+                row.name_entry.last_value = value
+                self._rename_flag(row, value)
+
+
+    def _scroll_to(self, offset: int) -> None:
+        offset = max(0, min(offset, len(self._view) - self.ROW_COUNT))
+        if offset == self._offset: return
+        self._commit_focused_row()
+        self._offset = offset
+        self._render()
+
+
+    def _on_scrollbar(self, *args) -> None:
+        match args:
+            case ("moveto", fraction): self._scroll_to(int(float(fraction) * len(self._view)))
+            case ("scroll", amount, "pages"): self._scroll_to(self._offset + int(amount) * self.ROW_COUNT)
+            case ("scroll", amount, _): self._scroll_to(self._offset + int(amount))
+
+
+    def _on_mouse_wheel(self, event) -> None:
+        self._scroll_to(self._offset - int(event.delta / 120) * 3)
+
+
+    def _on_search_input(self, _) -> None:
+        if self._search_after_id is not None: self.after_cancel(self._search_after_id)
+        self._search_after_id = self.after(self._SEARCH_DELAY, self._apply_search)
+
+
+    def _apply_search(self) -> None:
+        self._search_after_id = None
+        query: str = self.search_entry.get().strip().lower()
+        if query == self._query: return
+        self._commit_focused_row()
+        self._query = query
+        self._offset = 0
+        self._update_view()
+
+
+    @staticmethod
+    def _format_value(value: Any) -> str:
+        return value if isinstance(value, str) else json.dumps(value)
+
+
+    @staticmethod
+    def _parse_value(text: str, old_value: Any) -> Any:
+        """Edited values keep the type of the old value, raises ValueError if they can't"""
+
+        match old_value:
+            case str(): return text
+            case bool():
+                if text.strip().lower() not in {"true", "false"}: raise ValueError(f"Expected true or false, got: {text}")
+                return text.strip().lower() == "true"
+            case int(): return int(text.strip())
+            case float(): return float(text.strip())
+        try: return json.loads(text)
+        except ValueError: return text
+
+
+    def _rename_flag(self, row: _FlagRow, value: str) -> None:
+        old_name: str | None = row.name
+        new_name: str = value.strip()
+        if old_name is None or new_name == old_name: return
+        if new_name in self._data:
+            self._show_warning("menu.fastflags.fastflag_editor.exception.message.duplicate", {"{name}": new_name})
+            row.name_entry.set(old_name)
+            return
+
+        self._data = {(new_name if name == old_name else name): value for name, value in self._data.items()}
+        index: int = self._names.index(old_name)
+        self._names[index] = new_name
+        self._search_index.pop(old_name, None)
+        self._search_index[new_name] = new_name.lower()
+        row.name = new_name
+        self._schedule_save()
+        self._update_view()
+
+
+    def _set_flag_value(self, row: _FlagRow, text: str) -> None:
+        name: str | None = row.name
+        if name is None: return
+        old_value: Any = self._data[name]
+        if text == self._format_value(old_value): return
+
+        try: value: Any = self._parse_value(text, old_value)
+        except ValueError as e:
+            self._show_warning("menu.fastflags.fastflag_editor.exception.message.invalid_value", {"{name}": name, "{exception.message}": str(e)})
+            row.value_entry.set(self._format_value(old_value))
+            return
+        self._data[name] = value
+        self._schedule_save()
+
+
+    def _add_flag(self) -> None:
+        name: str = self.new_name_entry.get().strip()
+        if not name: return
+        if name in self._data:
+            self._show_warning("menu.fastflags.fastflag_editor.exception.message.duplicate", {"{name}": name})
+            return
+
+        self._data[name] = self.new_value_entry.get()  # Stored as a string, same as imported flags
+        self._names.append(name)
+        self._search_index[name] = name.lower()
+        self.new_name_entry.delete(0, "end")
+        self.new_value_entry.delete(0, "end")
+        self._schedule_save()
+
+        if self._query: self.search_entry.delete(0, "end")
+        self._query = ""
+        self._offset = len(self._names)  # Scroll to the new flag
+        self._update_view()
+
+
+    def _delete_flag(self, row: _FlagRow) -> None:
+        name: str | None = row.name
+        if name is None: return
+        self._data.pop(name, None)
+        self._names.remove(name)
+        self._search_index.pop(name, None)
+        self._schedule_save()
+        self._update_view()
+
+
+    def _schedule_save(self) -> None:
+        """Edits are coalesced, saving rewrites the whole profile"""
+
+        if self._save_after_id is not None: self.after_cancel(self._save_after_id)
+        self._save_after_id = self.after(self._SAVE_DELAY, self._save)
+
+
+    def _save(self) -> None:
+        if self._save_after_id is not None:
+            self.after_cancel(self._save_after_id)
+            self._save_after_id = None
+        try: self.profile.set_data(dict(self._data))
+        except Exception as e:
+            self._show_warning("menu.fastflags.fastflag_editor.exception.message.save", {"{exception.type}": f"{type(e).__module__}.{type(e).__qualname__}", "{exception.message}": str(e)})
+
+
+    def _show_warning(self, key: str, replacements: dict[str, str]) -> None:
+        messagebox.showwarning(title=f"{ProjectData.NAME} ({ProjectData.VERSION})", message=Localizer.format(Localizer.Strings[key], replacements))
+        self.focus()
+        self.lift(aboveThis=self.root)
+# endregion
 
 
 # region functions
@@ -153,24 +408,6 @@ class FastFlagEditorWindow(Toplevel):
         self.after(self._BACKGROUND_TASK_INTERVAL, self._run_background_tasks)
 
 
-    def _save_data(self, event) -> None:
-        textbox_string = event.value
-        try:
-            textbox_data: dict = json.loads(textbox_string)
-            self.profile.set_data(textbox_data)
-
-        except Exception as e:
-            messagebox.showwarning(
-                title=f"{ProjectData.NAME} ({ProjectData.VERSION})",
-                message=Localizer.format(
-                    Localizer.Strings["menu.fastflags.fastflag_editor.exception.message.save"],
-                    {"{exception.type}": f"{type(e).__module__}.{type(e).__qualname__}", "{exception.message}": str(e)}
-                )
-            )
-            self.focus()
-            self.lift(aboveThis=self.root)
-
-
     def _import_data(self) -> None:
         filepath: str | Literal[''] = filedialog.askopenfilename(
             initialdir=str(Directories.DOWNLOADS),
@@ -185,9 +422,11 @@ class FastFlagEditorWindow(Toplevel):
         try:
             with open(path) as file:
                 data: dict = json.load(file)
+            if not isinstance(data, dict): raise TypeError(f"Expected a JSON object, got {type(data).__name__}")
             self.profile.set_data(data)
-            data_string: str = json.dumps(data, indent=4)
-            self.data_textbox.set(data_string)
+            self._load_data(data)
+            self._offset = 0
+            self._update_view()
 
         except Exception as e:
             messagebox.showwarning(
@@ -213,6 +452,7 @@ class FastFlagEditorWindow(Toplevel):
             return
         path: Path = Path(filepath)
 
+        if self._save_after_id is not None: self._save()
         try:
             data: dict = self.profile.data
             with open(path, "w") as file:
@@ -231,6 +471,7 @@ class FastFlagEditorWindow(Toplevel):
 
 
     def _copy_data(self) -> None:
+        if self._save_after_id is not None: self._save()
         data: dict = self.profile.data
         data_string: str = json.dumps(data, indent=4)
         pyperclip.copy(data_string)
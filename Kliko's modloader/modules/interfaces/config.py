@@ -1,18 +1,46 @@
 from pathlib import Path
-from typing import Literal, Optional, Any
+from typing import Literal, Optional, Any, NamedTuple, Callable
 from copy import deepcopy
 
 from modules.logger import Logger
 from modules.backend import ConfigEditor
-from modules.filesystem import Files, Directories
+from modules.filesystem import Files, Directories, FileWatcher
 from modules.localization import Localizer
 
 
+class ConfigSnapshot(NamedTuple):
+    """All settings from a single read, values with an invalid type are replaced by their default"""
+    appearance: str
+    language: str
+    launcher: str
+    check_for_updates: bool
+    confirm_launch: bool
+    deployment_info: bool
+    force_reinstall: bool
+    disable_mods: bool
+    hardlink_mods: bool
+    disable_fastflags: bool
+    static_version_folder: bool
+    registry_keys: bool
+    use_roblox_version_folder: bool
+    menu_size: tuple[int, int]
+    mod_updates: bool
+    multi_instance_launching: bool
+    discord_rpc: bool
+    activity_joining: bool
+    show_user_in_rpc: bool
+    bloxstrap_rpc_sdk: bool
+
+
 class ConfigInterface:
     _dev_mode: bool | None = None
     LOG_PREFIX: str = "ConfigInterface"
     FILEPATH: Path = Files.CONFIG
-    EDITOR: ConfigEditor = ConfigEditor(FILEPATH)
+    EDITOR: ConfigEditor = ConfigEditor(FILEPATH, cached=True, write_delay=0.25)
+    _callback_dict: dict[str, Callable[[ConfigSnapshot], Any]] = {}
+    _callback_id_counter: int = 0
+    _watcher: Optional[FileWatcher] = None
+    _last_snapshot: Optional[ConfigSnapshot] = None
     DEFAULT_CONFIG: dict = {
         "appearance": "system",
         "language": "en_US",
@@ -23,6 +51,7 @@ class ConfigInterface:
         "deployment_info": False,
         "force_reinstall": False,
         "disable_mods": False,
+        "hardlink_mods": False,
         "disable_fastflags": False,
         "static_version_folder": False,
         "registry_keys": True,
@@ -50,6 +79,15 @@ class ConfigInterface:
             return deepcopy(cls.DEFAULT_CONFIG)
 
 
+    @classmethod
+    def _update(cls, function: Callable[[dict], Any]) -> None:
+        try: cls.EDITOR.update(function)
+        except Exception as e:
+            Logger.error(f"Unable to update config due to {type(e).__name__}: {e}", prefix=cls.LOG_PREFIX)
+            cls.restore_default_settings()
+            cls.EDITOR.update(function)
+
+
     @classmethod
     def verify_file_integrity(cls) -> None:
         Logger.info("Verifying config...", prefix=cls.LOG_PREFIX)
@@ -72,8 +110,8 @@ class ConfigInterface:
     @classmethod
     def restore_default_settings(cls, silent: bool = False) -> None:
         if not silent: Logger.info("Restoring default settings...", prefix=cls.LOG_PREFIX)
-        if cls.FILEPATH.exists(): cls.FILEPATH.unlink()
         cls.EDITOR.write(cls.DEFAULT_CONFIG)
+        cls.EDITOR.flush()  # Replaces the file right away instead of after write_delay
 
 
     @classmethod
@@ -125,7 +163,12 @@ class ConfigInterface:
 
     @classmethod
     def get_menu_size(cls) -> tuple[int, int]:
-        menu_size: dict = cls.get("menu_size", cls.DEFAULT_CONFIG["menu_size"])
+        return cls._parse_menu_size(cls.get("menu_size", cls.DEFAULT_CONFIG["menu_size"]))
+
+
+    @classmethod
+    def _parse_menu_size(cls, menu_size: Any) -> tuple[int, int]:
+        if not isinstance(menu_size, dict): menu_size = cls.DEFAULT_CONFIG["menu_size"]
 
         width: int | Any = menu_size.get("w")
         if not isinstance(width, int): width = cls.DEFAULT_CONFIG["menu_size"]["w"]
@@ -179,6 +222,63 @@ class ConfigInterface:
 
     @classmethod
     def set(cls, key: str, value: Any) -> None:
-        data: dict = cls._read()
-        data[key] = value
-        cls.EDITOR.write(data)
\ No newline at end of file
+        cls._update(lambda data: data.__setitem__(key, value))
+
+
+    @classmethod
+    def set_many(cls, values: dict[str, Any]) -> None:
+        """Sets all values in a single read-modify-write and save, so callbacks are called once. Nothing is written if any key is unknown"""
+
+        unknown_keys: list[str] = [key for key in values if key not in cls.DEFAULT_CONFIG]
+        if unknown_keys:
+            Logger.error(f"Unknown settings: {', '.join(unknown_keys)}", prefix=cls.LOG_PREFIX)
+            raise KeyError(f"Unknown settings: {', '.join(unknown_keys)}")
+
+        cls._update(lambda data: data.update(values))
+
+
+    @classmethod
+    def snapshot(cls, data: Optional[dict] = None) -> ConfigSnapshot:
+        """data is read from the config file if not given"""
+
+        if data is None: data = cls._read()
+        values: dict[str, Any] = {}
+        for key in ConfigSnapshot._fields:
+            default: Any = cls.DEFAULT_CONFIG[key]
+            value: Any = data.get(key, default)
+            if key == "menu_size": value = cls._parse_menu_size(value)
+            elif not isinstance(value, type(default)): value = default
+            values[key] = value
+        return ConfigSnapshot(**values)
+
+
+    @classmethod
+    def add_callback(cls, callback: Callable[[ConfigSnapshot], Any]) -> str:
+        """callback receives a new snapshot whenever the settings change. It is called from a background thread"""
+
+        cls._callback_id_counter += 1
+        id: str = str(cls._callback_id_counter)
+        cls._callback_dict[id] = callback
+        if cls._watcher is None:
+            cls._last_snapshot = cls.snapshot()
+            cls._watcher = FileWatcher([cls.FILEPATH], cls._on_file_change)
+            cls._watcher.start()
+        return id
+
+
+    @classmethod
+    def remove_callback(cls, id: str) -> None:
+        cls._callback_dict.pop(id, None)
+        if not cls._callback_dict and cls._watcher is not None:
+            cls._watcher.stop()
+            cls._watcher = None
+
+
+    @classmethod
+    def _on_file_change(cls) -> None:
+        snapshot: ConfigSnapshot = cls.snapshot()
+        if snapshot == cls._last_snapshot: return  # Unrelated file in the same directory, or an unchanged write
+        cls._last_snapshot = snapshot
+        for callback in list(cls._callback_dict.values()):
+            try: callback(snapshot)
+            except Exception as e: Logger.error(f"Config callback failed! {type(e).__name__}: {e}", prefix=cls.LOG_PREFIX)
\ No newline at end of file
@@ -64,7 +64,7 @@ class CustomIntegration:
 class CustomIntegrationManager:
     LOG_PREFIX: str = "CustomIntegrationManager"
     CONFIG_PATH: Path = Files.CUSTOM_INTEGRATIONS_CONFIG
-    ConfigEditor = ConfigEditor(CONFIG_PATH, delete_if_empty=True)
+    ConfigEditor = ConfigEditor(CONFIG_PATH, delete_if_empty=True, cached=True)
 
 
     @classmethod
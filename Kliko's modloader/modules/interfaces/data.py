@@ -8,7 +8,7 @@ from modules.filesystem import Files
 class DataInterface:
     LOG_PREFIX: str = "DataInterface"
     FILEPATH: Path = Files.DATA
-    EDITOR: ConfigEditor = ConfigEditor(FILEPATH)
+    EDITOR: ConfigEditor = ConfigEditor(FILEPATH, cached=True)
 
 
     @classmethod
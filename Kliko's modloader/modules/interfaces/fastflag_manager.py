@@ -71,18 +71,34 @@ class FastFlagProfile:
 class FastFlagManager:
     LOG_PREFIX: str = "FastFlagManager"
     CONFIG_PATH: Path = Files.FASTFLAG_CONFIG
-    ConfigEditor = ConfigEditor(CONFIG_PATH, delete_if_empty=True)
+    ConfigEditor = ConfigEditor(CONFIG_PATH, delete_if_empty=True, cached=True)
+
+    # Profiles by name, in config order. Rebuilt whenever the editor's version changes
+    _index: dict[str, dict] = {}
+    _index_version: Optional[int] = None
 
 
     @classmethod
-    def _read(cls) -> list[dict]:
-        try: return cls.ConfigEditor.read()
+    def _read(cls, copy: bool = True) -> list[dict]:
+        try: return cls.ConfigEditor.read(copy=copy)
         except FileNotFoundError: return []
         except Exception as e:
             Logger.error(f"Unable to load config due to {type(e).__name__}: {e}", prefix=cls.LOG_PREFIX)
             raise
 
 
+    @classmethod
+    def _get_index(cls) -> dict[str, dict]:
+        """Items are shared with the editor's cache, they must not be modified"""
+
+        data: list[dict] = cls._read(copy=False)
+        version: int = cls.ConfigEditor.version
+        if version != cls._index_version:
+            cls._index = {item["name"]: item for item in data if isinstance(item, dict) and "name" in item}
+            cls._index_version = version
+        return cls._index
+
+
     @classmethod
     def _write(cls, data: list[dict]) -> None:
         cls.ConfigEditor.write(data)
@@ -90,8 +106,7 @@ class FastFlagManager:
 
     @classmethod
     def get_config(cls, *profiles: str, data: Optional[list[dict]] = None) -> list[FastFlagProfile]:
-        if not data: data = cls._read()
-        data_dict: dict = {item["name"]: item for item in data}
+        data_dict: dict[str, dict] = {item["name"]: item for item in data} if data else cls._get_index()
 
         configs: list[FastFlagProfile] = []
         for name in profiles:
@@ -103,6 +118,7 @@ class FastFlagManager:
             player: bool = config.get("enabled", False)
             studio: bool = config.get("enabled_studio", False)
             if not isinstance(fastflags, dict): fastflags = {}
+            else: fastflags = dict(fastflags)  # Don't share the cached dict
             if not isinstance(player, bool): player = False
             if not isinstance(studio, bool): studio = False
 
@@ -114,9 +130,7 @@ class FastFlagManager:
 
     @classmethod
     def get_all(cls, sorted: bool = False) -> list[FastFlagProfile]:
-        data: list[dict] = cls._read()
-        names: list[str] = [item["name"] for item in data]
-        configs: list[FastFlagProfile] = cls.get_config(*names, data=data)
+        configs: list[FastFlagProfile] = cls.get_config(*cls._get_index())
 
         if sorted: return natsorted(configs, key=lambda mod: mod.name.lower())
         return configs
@@ -132,19 +146,25 @@ class FastFlagManager:
 
     @classmethod
     def update_config(cls, profile: FastFlagProfile) -> None:
-        data: list[dict] = cls._read()
-        data = [item for item in data if item.get("name") != profile.name]
+        data: list[dict] = [item for item in cls._read() if not cls._is_profile(item, profile.name)]  # Updated profiles move to the end
         data.append({"name": profile.name, "enabled": profile.player, "enabled_studio": profile.studio, "data": profile.data})
         cls._write(data)
 
 
     @classmethod
     def remove_from_config(cls, name: str) -> None:
-        data: list[dict] = cls._read()
-        data = [item for item in data if item.get("name") != name]
+        if name not in cls._get_index(): return
+        data: list[dict] = [item for item in cls._read() if not cls._is_profile(item, name)]
         cls._write(data)
 
 
+    @staticmethod
+    def _is_profile(item: Any, name: str) -> bool:
+        """Other items are kept as they are"""
+
+        return isinstance(item, dict) and item.get("name") == name
+
+
     @classmethod
     def deploy_active_profiles(cls, target_file: str | Path, mode: Optional[Literal["player", "studio"]] = None, manual_override: dict = {}) -> None:
         cls.deploy_profiles(target_file=target_file, profiles=cls.get_active(mode=mode), manual_override=manual_override)
@@ -166,6 +186,16 @@ class FastFlagManager:
             target_file.unlink(missing_ok=True)
             return
 
+        content: bytes = json.dumps(fastflags, indent=4).encode()
+        try:
+            if target_file.stat().st_size == len(content) and target_file.read_bytes() == content:
+                Logger.info("FastFlags are up to date", prefix=cls.LOG_PREFIX)
+                return
+        except OSError: pass
+
+        # Replaced instead of written in place, the old file may be a hard link into the mod store
         target_file.parent.mkdir(parents=True, exist_ok=True)
-        with open(target_file, "w") as file:
-            json.dump(fastflags, file, indent=4)
\ No newline at end of file
+        temp: Path = target_file.with_name(f"{target_file.name}.tmp")
+        with open(temp, "wb") as file:
+            file.write(content)
+        temp.replace(target_file)
\ No newline at end of file
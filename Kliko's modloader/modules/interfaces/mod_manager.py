@@ -1,10 +1,14 @@
 from pathlib import Path
 from typing import Optional, Literal, Any
 import shutil
+import copy
+import stat
+import os
 
 from modules.backend import ConfigEditor
-from modules.filesystem import Files, Directories, extract, EmptyFileNameError, ReservedFileNameError, InvalidFileNameError, TrailingDotError
+from modules.filesystem import Files, Directories, EmptyFileNameError, ReservedFileNameError, InvalidFileNameError, TrailingDotError
 from modules.logger import Logger
+from modules.mod_deployer import DeploymentPlan, DeploymentManifest, get_fingerprint
 
 from natsort import natsorted
 
@@ -96,7 +100,11 @@ class ModManager:
     LOG_PREFIX: str = "ModManger"
     DIRECTORY: Path = Directories.MODS
     CONFIG_PATH: Path = Files.MOD_CONFIG
-    ConfigEditor = ConfigEditor(CONFIG_PATH, delete_if_empty=True)
+    ConfigEditor = ConfigEditor(CONFIG_PATH, delete_if_empty=True, cached=True, write_delay=0.25)
+
+    # Inventory cache, invalidated when the mods directory or the config file changes
+    _inventory_key: Optional[tuple] = None
+    _inventory: dict[Optional[str], list[Mod]] = {}
 
 
     @classmethod
@@ -112,6 +120,7 @@ class ModManager:
     def _write(cls, data: list[dict]) -> None:
         data = [item for item in data if not (item.get("enabled", False) == False and item.get("enabled_studio", False) == False and item.get("priority", 0) == 0)]
         cls.ConfigEditor.write(data)
+        cls._inventory_key = None
 
 
     @classmethod
@@ -139,16 +148,43 @@ class ModManager:
         return configs
 
 
+    @classmethod
+    def _get_inventory_key(cls) -> Optional[tuple]:
+        """Adding, removing or renaming a mod changes the directory's mtime, the config file changes on every write"""
+
+        try: directory_stat: os.stat_result = cls.DIRECTORY.stat()
+        except OSError: return None
+        if not stat.S_ISDIR(directory_stat.st_mode): return None
+        try:
+            config_stat: os.stat_result = cls.CONFIG_PATH.stat()
+            return directory_stat.st_mtime_ns, config_stat.st_mtime_ns, config_stat.st_size
+        except OSError: return directory_stat.st_mtime_ns, None, None
+
+
     @classmethod
     def get_all(cls, sort: Optional[Literal["name", "priority"]] = None) -> list[Mod]:
-        if not cls.DIRECTORY.is_dir(): return []
-        mods: list[tuple[str, Path]] = [(path.with_suffix("").name, path) for path in cls.DIRECTORY.iterdir() if path.is_dir() or (path.is_file() and path.suffix in SUPPORTED_FILETPYES)]
-        configs: list[Mod] = cls.get_config(*mods)
+        key: Optional[tuple] = cls._get_inventory_key()
+        if key is None: return []
+        if key != cls._inventory_key:
+            cls._inventory = {}
+            cls._inventory_key = key
+
+        # Callers may modify the returned mods (e.g. Mod.rename), so they get copies of the cached ones
+        cached: list[Mod] | None = cls._inventory.get(sort)
+        if cached is not None: return [copy.copy(mod) for mod in cached]
+
+        configs: list[Mod] | None = cls._inventory.get(None)
+        if configs is None:
+            mods: list[tuple[str, Path]] = [(path.with_suffix("").name, path) for path in cls.DIRECTORY.iterdir() if not path.name.startswith(".") and (path.is_dir() or (path.is_file() and path.suffix in SUPPORTED_FILETPYES))]
+            configs = cls.get_config(*mods)
+            cls._inventory[None] = configs
 
         match sort:
-            case "name": return natsorted(configs, key=lambda mod: mod.name.lower())
-            case "priority": return sorted(configs, key=lambda mod: mod.priority)
-            case _: return configs
+            case "name": cached = natsorted(configs, key=lambda mod: mod.name.lower())
+            case "priority": cached = sorted(configs, key=lambda mod: mod.priority)
+            case _: cached = configs
+        cls._inventory[sort] = cached
+        return [copy.copy(mod) for mod in cached]
 
 
     @classmethod
@@ -175,15 +211,22 @@ class ModManager:
 
 
     @classmethod
-    def deploy_active_mods(cls, target_directory: str | Path, mode: Optional[Literal["player", "studio"]] = None) -> None:
-        cls.deploy_mods(target_directory=target_directory, mods=cls.get_active(mode=mode))
+    def deploy_active_mods(cls, target_directory: str | Path, mode: Optional[Literal["player", "studio"]] = None, link: bool = False) -> None:
+        cls.deploy_mods(target_directory=target_directory, mods=cls.get_active(mode=mode), link=link)
 
 
     @classmethod
-    def deploy_mods(cls, target_directory: str | Path, mods: list[Mod]) -> None:
-        target_directory = Path(target_directory)
+    def deploy_mods(cls, target_directory: str | Path, mods: list[Mod], workers: Optional[int] = None, link: bool = False) -> None:
+        """Mods are expected in priority order, conflicts are resolved in memory so each file is only written once. If link is True, files are hard-linked from the mod store instead of copied"""
 
-        for mod in mods:
-            Logger.info(f"Deploying mod: {mod.name}...", prefix=cls.LOG_PREFIX)
-            if not mod.archive: shutil.copytree(mod.path, target_directory, dirs_exist_ok=True)
-            else: extract(mod.path, target_directory)
\ No newline at end of file
+        target_directory = Path(target_directory)
+        fingerprints: dict[str, str] = {mod.name: get_fingerprint(mod.path, mod.archive) for mod in mods}
+        manifest: DeploymentManifest = DeploymentManifest.load(target_directory)
+        if manifest.is_up_to_date(fingerprints, target_directory):
+            Logger.info("Deployed mods are up to date", prefix=cls.LOG_PREFIX)
+            return
+
+        Logger.info(f"Deploying mods: {', '.join(mod.name for mod in mods)}...", prefix=cls.LOG_PREFIX)
+        plan: DeploymentPlan = DeploymentPlan(mods)
+        new_manifest: DeploymentManifest = plan.execute(target_directory, fingerprints, manifest=manifest, workers=workers, link=link)
+        new_manifest.save(target_directory)
\ No newline at end of file
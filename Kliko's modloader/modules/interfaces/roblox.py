@@ -5,6 +5,9 @@ import psutil  # type: ignore
 
 
 class RobloxInterface:
+    _processes: dict[str, psutil.Process] = {}  # Last found process for each executable name
+
+
     @classmethod
     def is_roblox_running(cls, mode: Literal["Player", "Studio"] | None = None) -> bool:
         match mode:
@@ -15,12 +18,19 @@ class RobloxInterface:
 
     @classmethod
     def _process_exists(cls, name: str) -> bool:
-        for process in psutil.process_iter():
+        """Only scans all processes if the last found process has exited. is_running() also detects PID reuse"""
+
+        process: psutil.Process | None = cls._processes.get(name)
+        if process is not None:
             try:
-                if process.name() == name:
-                    return True
-            except psutil.NoSuchProcess:
-                continue
+                if process.is_running(): return True
+            except psutil.Error: pass
+            cls._processes.pop(name, None)
+
+        for process in psutil.process_iter(["name"]):
+            if process.info.get("name") == name:
+                cls._processes[name] = process
+                return True
         return False
     
 
@@ -34,4 +44,5 @@ class RobloxInterface:
 
     @classmethod
     def _kill_process(cls, name: str) -> None:
+        cls._processes.pop(name, None)
         subprocess.run(["TASKKILL", "/F", "/IM", name], creationflags=subprocess.CREATE_NO_WINDOW, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
\ No newline at end of file
@@ -7,7 +7,7 @@ from modules.filesystem import Files
 class ShortcutsInterface:
     LOG_PREFIX: str = "ShortcutInterface"
     FILEPATH: Path = Files.SHORTCUTS_CONFIG
-    EDITOR: ConfigEditor = ConfigEditor(FILEPATH, delete_if_empty=True)
+    EDITOR: ConfigEditor = ConfigEditor(FILEPATH, delete_if_empty=True, cached=True)
 
 
     @classmethod
@@ -0,0 +1,5 @@
+from .plan import DeploymentPlan, PlannedFile
+from .store import ModStore
+from .manifest import DeploymentManifest, DeployedFile
+from .fingerprint import get_fingerprint
+from .pristine import PristineStore
\ No newline at end of file
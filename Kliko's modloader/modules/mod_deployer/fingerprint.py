@@ -0,0 +1,31 @@
+from pathlib import Path
+from zipfile import ZipFile
+import hashlib
+import os
+
+from py7zr import SevenZipFile # type: ignore
+
+
+def get_fingerprint(path: Path, archive: bool) -> str:
+    """Based on file metadata (and the CRC set of archives, read from the central directory), no file data is read"""
+
+    hasher = hashlib.sha1(str(path).lower().encode())
+    if archive:
+        stat: os.stat_result = path.stat()
+        hasher.update(f"{stat.st_size}:{stat.st_mtime_ns}".encode())
+        match path.suffix:
+            case ".zip":
+                with ZipFile(path, "r") as zip_archive:
+                    for member in zip_archive.infolist():
+                        hasher.update(f"{member.filename}:{member.CRC}".encode())
+            case ".7z":
+                with SevenZipFile(path, "r") as sevenzip_archive:
+                    for member in sevenzip_archive.list():
+                        hasher.update(f"{member.filename}:{member.crc32}".encode())
+    else:
+        for dirpath, _, filenames in os.walk(path):
+            for filename in sorted(filenames):
+                filepath: Path = Path(dirpath, filename)
+                stat = filepath.stat()
+                hasher.update(f"{filepath.relative_to(path).as_posix()}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+    return hasher.hexdigest()
\ No newline at end of file
@@ -0,0 +1,76 @@
+from pathlib import Path
+from dataclasses import dataclass, field
+from typing import Optional, ClassVar
+import json
+import os
+
+from modules.logger import Logger
+
+
+@dataclass
+class DeployedFile:
+    member: str
+    mod: str
+    size: int
+    mtime_ns: int
+    pristine: Optional[str] = None  # Hash of the original file in the PristineStore, None if the mod added a new file
+
+
+@dataclass
+class DeploymentManifest:
+    """Deployed state of a version folder: the fingerprint of each mod and the files it wrote"""
+    mods: dict[str, str] = field(default_factory=dict)  # Mod name: fingerprint, in priority order
+    files: dict[str, DeployedFile] = field(default_factory=dict)  # Keys are case-folded, same as DeploymentPlan.files
+
+    FILENAME: ClassVar[str] = ".modloader_manifest.json"
+    _LOG_PREFIX: ClassVar[str] = "DeploymentManifest"
+
+
+    @classmethod
+    def load(cls, target_directory: Path) -> "DeploymentManifest":
+        """Returns an empty manifest if the version folder has none, or if it can't be read"""
+
+        try:
+            with open(target_directory / cls.FILENAME) as file:
+                data: dict = json.load(file)
+            mods: dict[str, str] = {str(name): str(fingerprint) for name, fingerprint in data["mods"]}
+            files: dict[str, DeployedFile] = {item[0].lower(): DeployedFile(*item) for item in data["files"]}
+            return cls(mods, files)
+        except FileNotFoundError: return cls()
+        except (OSError, ValueError, TypeError, KeyError) as e:
+            Logger.warning(f"Failed to read manifest! {type(e).__name__}: {e}", prefix=cls._LOG_PREFIX)
+            return cls()
+
+
+    def save(self, target_directory: Path) -> None:
+        data: dict = {
+            "mods": [[name, fingerprint] for name, fingerprint in self.mods.items()],
+            "files": [[file.member, file.mod, file.size, file.mtime_ns, file.pristine] for file in self.files.values()]
+        }
+        temp: Path = target_directory / f"{self.FILENAME}.tmp"
+        with open(temp, "w") as file:
+            json.dump(data, file)
+        temp.replace(target_directory / self.FILENAME)
+
+
+    @classmethod
+    def delete(cls, target_directory: Path) -> None:
+        (target_directory / cls.FILENAME).unlink(missing_ok=True)
+
+
+    def is_up_to_date(self, fingerprints: dict[str, str], target_directory: Path) -> bool:
+        """True if the same mods are deployed in the same order, and none of their files were modified since"""
+
+        if list(self.mods.items()) != list(fingerprints.items()): return False
+        return all(self.is_file_current(key, target_directory) for key in self.files)
+
+
+    def is_file_current(self, key: str, target_directory: Path, mod: Optional[str] = None, fingerprint: Optional[str] = None) -> bool:
+        """True if the file was deployed by the given mod (with the given fingerprint) and hasn't been modified since"""
+
+        file: DeployedFile | None = self.files.get(key)
+        if file is None: return False
+        if mod is not None and (file.mod != mod or self.mods.get(mod) != fingerprint): return False
+        try: stat: os.stat_result = (target_directory / file.member).stat()
+        except OSError: return False
+        return stat.st_size == file.size and stat.st_mtime_ns == file.mtime_ns
\ No newline at end of file
@@ -0,0 +1,175 @@
+from pathlib import Path
+from zipfile import ZipFile
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, TYPE_CHECKING
+import shutil
+import os
+
+from modules.logger import Logger
+from modules.filesystem import extract
+
+from .store import ModStore
+from .manifest import DeploymentManifest, DeployedFile
+from .pristine import PristineStore
+
+from py7zr import SevenZipFile # type: ignore
+
+if TYPE_CHECKING: from modules.interfaces.mod_manager import Mod
+
+
+@dataclass
+class PlannedFile:
+    mod: str
+    source: Path
+    member: str  # Relative path inside the mod, using forward slashes
+    size: int
+    archive: bool
+
+
+class DeploymentPlan:
+    """Merged file map of all mods. Mods later in the list take precedence, every destination file is written once"""
+    files: dict[str, PlannedFile]  # Keys are case-folded (Windows paths are case-insensitive)
+
+    _LOG_PREFIX: str = "DeploymentPlan"
+
+
+    def __init__(self, mods: list["Mod"]) -> None:
+        self.files = {}
+        for mod in mods:
+            Logger.info(f"Planning mod: {mod.name}...", prefix=self._LOG_PREFIX)
+            for member, size in self._list_files(mod.path, mod.archive):
+                self.files[member.lower()] = PlannedFile(mod.name, mod.path, member, size, mod.archive)
+
+
+    @staticmethod
+    def _list_files(path: Path, archive: bool) -> list[tuple[str, int]]:
+        """Only reads directory entries / the archive's central directory, no file data"""
+
+        if not archive:
+            files: list[tuple[str, int]] = []
+            for dirpath, _, filenames in os.walk(path):
+                for filename in filenames:
+                    filepath: Path = Path(dirpath, filename)
+                    files.append((filepath.relative_to(path).as_posix(), filepath.stat().st_size))
+            return files
+
+        match path.suffix:
+            case ".zip":
+                with ZipFile(path, "r") as zip_archive:
+                    return [(member.filename, member.file_size) for member in zip_archive.infolist() if not member.is_dir()]
+
+            case ".7z":
+                with SevenZipFile(path, "r") as sevenzip_archive:
+                    return [(member.filename.replace("\\", "/"), member.uncompressed or 0) for member in sevenzip_archive.list() if not member.is_directory]
+
+            case other: raise ValueError(f"Unsupported filetype: {other}")
+
+
+    def get_sources(self) -> dict[Path, list[PlannedFile]]:
+        sources: dict[Path, list[PlannedFile]] = {}
+        for file in self.files.values():
+            sources.setdefault(file.source, []).append(file)
+        return sources
+
+
+    def execute(self, target_directory: Path, fingerprints: dict[str, str], manifest: Optional[DeploymentManifest] = None, workers: Optional[int] = None, link: bool = False) -> DeploymentManifest:
+        """
+        Files that the previous deployment (manifest) wrote from an unchanged mod are skipped.
+        Original files are moved to the PristineStore before a mod replaces them, and restored once no mod replaces them anymore.
+        Existing files without a manifest entry are assumed to be originals. Without a manifest they're unknown, so the current files are kept in the PristineStore as they are.
+        Returns the new manifest.
+        """
+
+        target_directory.mkdir(parents=True, exist_ok=True)
+        if manifest is None: manifest = DeploymentManifest()
+
+        pristine: dict[str, Optional[str]] = {}
+        saved_files: dict[str, DeployedFile] = {}
+        sources: dict[Path, list[PlannedFile]] = {}
+        for key, file in self.files.items():
+            deployed_file: DeployedFile | None = manifest.files.get(key)
+            if deployed_file is not None:
+                pristine[key] = deployed_file.pristine
+                if manifest.is_file_current(key, target_directory, mod=file.mod, fingerprint=fingerprints.get(file.mod)):
+                    continue
+            else:
+                target: Path = target_directory / file.member
+                pristine[key] = PristineStore.save(target_directory, target) if target.is_file() else None
+                if pristine[key] is not None: saved_files[key] = DeployedFile(file.member, file.mod, -1, -1, pristine[key])
+            sources.setdefault(file.source, []).append(file)
+
+        if saved_files:  # Don't lose track of the originals if deployment fails halfway
+            manifest.files.update(saved_files)
+            manifest.save(target_directory)
+
+        removed_files: list[DeployedFile] = [file for key, file in manifest.files.items() if key not in self.files]
+        Logger.info(f"Deploying {sum(len(files) for files in sources.values())}/{len(self.files)} files, restoring {len(removed_files)} files...", prefix=self._LOG_PREFIX)
+
+        if link: self._link_files(sources, target_directory, workers)
+        else: self._copy_files(sources, target_directory, workers)
+
+        for removed_file in removed_files:
+            if removed_file.pristine is not None: PristineStore.restore(target_directory, removed_file.pristine, target_directory / removed_file.member)
+            else: (target_directory / removed_file.member).unlink(missing_ok=True)
+
+        new_manifest: DeploymentManifest = DeploymentManifest(mods=dict(fingerprints))
+        for key, file in self.files.items():
+            try:
+                stat: os.stat_result = (target_directory / file.member).stat()
+                size, mtime_ns = stat.st_size, stat.st_mtime_ns
+            except OSError: size, mtime_ns = -1, -1  # Missing, it is deployed again next time. The entry is kept so the original isn't lost
+            new_manifest.files[key] = DeployedFile(file.member, file.mod, size, mtime_ns, pristine[key])
+        PristineStore.cleanup(target_directory, {file.pristine for file in new_manifest.files.values() if file.pristine is not None})
+        return new_manifest
+
+
+    def _copy_files(self, sources: dict[Path, list[PlannedFile]], target_directory: Path, workers: Optional[int]) -> None:
+        directory_files: list[PlannedFile] = [file for files in sources.values() for file in files if not file.archive]
+        for directory in {(target_directory / file.member).parent for file in directory_files}:
+            directory.mkdir(parents=True, exist_ok=True)
+
+        max_workers: int = workers or min(8, os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for _ in executor.map(lambda file: self._copy_file(file, target_directory), directory_files): pass
+
+        for source, files in sources.items():
+            if not files[0].archive:
+                continue
+            members: set[str] = {file.member for file in files}
+            extract(source, target_directory, include=lambda name: name in members, skip_identical=True, workers=workers)
+
+
+    def _link_files(self, sources: dict[Path, list[PlannedFile]], target_directory: Path, workers: Optional[int]) -> None:
+        links: list[tuple[Path, Path]] = []
+        for source, files in sources.items():
+            store_directory: Path = ModStore.get(source, files[0].archive)
+            links.extend((store_directory / file.member, target_directory / file.member) for file in files)
+
+        for directory in {target.parent for _, target in links}:
+            directory.mkdir(parents=True, exist_ok=True)
+
+        max_workers: int = workers or min(8, os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for _ in executor.map(lambda item: self._link_file(*item), links): pass
+        ModStore.cleanup()
+
+
+    @staticmethod
+    def _link_file(source: Path, target: Path) -> None:
+        try:
+            if os.path.samefile(source, target): return  # Already linked by a previous deployment
+        except OSError: pass
+
+        # Never write through an existing file, it may be a hard link to something else
+        target.unlink(missing_ok=True)
+        try: os.link(source, target)
+        except OSError: shutil.copy2(source, target)  # Different filesystem or no hard link support
+
+
+    @staticmethod
+    def _copy_file(file: PlannedFile, target_directory: Path) -> None:
+        source: Path = file.source / file.member
+        target: Path = target_directory / file.member
+        target.unlink(missing_ok=True)  # Don't write through a hard link left by a linked deployment
+        shutil.copy2(source, target)
\ No newline at end of file
@@ -0,0 +1,45 @@
+from pathlib import Path
+import hashlib
+import shutil
+import os
+
+
+class PristineStore:
+    """Original Roblox files that were replaced by mods, kept inside the version folder so they're removed along with it"""
+    DIRECTORY_NAME: str = ".modloader_pristine"
+
+
+    @classmethod
+    def save(cls, target_directory: Path, file: Path) -> str:
+        """Moves the original file into the store, returns its hash"""
+
+        hasher = hashlib.sha1()
+        with open(file, "rb") as stream:
+            for chunk in iter(lambda: stream.read(1024 * 1024), b""):
+                hasher.update(chunk)
+        file_hash: str = hasher.hexdigest()
+
+        directory: Path = target_directory / cls.DIRECTORY_NAME
+        directory.mkdir(exist_ok=True)
+        os.replace(file, directory / file_hash)  # The file is about to be overwritten, no need to copy it
+        return file_hash
+
+
+    @classmethod
+    def restore(cls, target_directory: Path, file_hash: str, file: Path) -> None:
+        source: Path = target_directory / cls.DIRECTORY_NAME / file_hash
+        file.unlink(missing_ok=True)
+        file.parent.mkdir(parents=True, exist_ok=True)
+        try: os.link(source, file)
+        except OSError: shutil.copy2(source, file)
+
+
+    @classmethod
+    def cleanup(cls, target_directory: Path, referenced: set[str]) -> None:
+        """Removes originals that are no longer replaced by any mod"""
+
+        directory: Path = target_directory / cls.DIRECTORY_NAME
+        if not directory.is_dir(): return
+        for path in directory.iterdir():
+            if path.name not in referenced:
+                path.unlink(missing_ok=True)
\ No newline at end of file
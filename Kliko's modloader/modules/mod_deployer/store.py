@@ -0,0 +1,79 @@
+from pathlib import Path
+from datetime import datetime, timedelta
+import shutil
+import json
+import os
+
+from modules.logger import Logger
+from modules.filesystem import Directories, extract
+
+from .fingerprint import get_fingerprint
+
+
+MAX_ENTRY_AGE: int = 7  # Days
+
+
+class ModStore:
+    """Keeps an unpacked copy of each mod, so mods can be hard-linked into the version folder instead of copied"""
+    DIRECTORY: Path = Directories.CACHE / "mod_store"
+    _INDEX_NAME: str = "index.json"
+    _FILES_NAME: str = "files"
+    _LOG_PREFIX: str = "ModStore"
+
+
+    @classmethod
+    def get(cls, path: Path, archive: bool) -> Path:
+        """Returns the unpacked directory of the given mod, (re)unpacking it if needed"""
+
+        entry: Path = cls.DIRECTORY / get_fingerprint(path, archive)
+        files: Path = entry / cls._FILES_NAME
+        index: Path = entry / cls._INDEX_NAME
+
+        if cls._is_valid(entry):
+            index.touch()
+            return files
+
+        Logger.info(f"Unpacking mod: {path.name}...", prefix=cls._LOG_PREFIX)
+        shutil.rmtree(entry, ignore_errors=True)
+        if archive: extract(path, files)
+        else: shutil.copytree(path, files)
+
+        # Store files are hard-linked into version folders, an in-place write there changes the store as well
+        # The index is used to detect this, so the entry can be unpacked again
+        index_data: dict[str, list[int]] = {}
+        for dirpath, _, filenames in os.walk(files):
+            for filename in filenames:
+                filepath: Path = Path(dirpath, filename)
+                stat: os.stat_result = filepath.stat()
+                index_data[filepath.relative_to(files).as_posix()] = [stat.st_size, stat.st_mtime_ns]
+        with open(index, "w") as file:
+            json.dump(index_data, file)
+        return files
+
+
+    @classmethod
+    def _is_valid(cls, entry: Path) -> bool:
+        try:
+            with open(entry / cls._INDEX_NAME) as file:
+                index_data: dict[str, list[int]] = json.load(file)
+            files: Path = entry / cls._FILES_NAME
+            for member, (size, mtime_ns) in index_data.items():
+                stat: os.stat_result = (files / member).stat()
+                if stat.st_size != size or stat.st_mtime_ns != mtime_ns:
+                    Logger.warning(f"Store entry modified: {member}", prefix=cls._LOG_PREFIX)
+                    return False
+            return True
+        except (OSError, ValueError, TypeError): return False
+
+
+    @classmethod
+    def cleanup(cls) -> None:
+        """Removes entries that haven't been used in a while"""
+
+        if not cls.DIRECTORY.is_dir(): return
+        for entry in cls.DIRECTORY.iterdir():
+            try: age: timedelta = datetime.now() - datetime.fromtimestamp((entry / cls._INDEX_NAME).stat().st_mtime)
+            except OSError: continue  # No index yet, another launcher instance may still be unpacking it
+            if age <= timedelta(days=MAX_ENTRY_AGE): continue
+            Logger.info(f"Removing unused store entry: {entry.name}", prefix=cls._LOG_PREFIX)
+            shutil.rmtree(entry, ignore_errors=True)
\ No newline at end of file
@@ -2,7 +2,6 @@ from typing import Literal, Optional
 from pathlib import Path
 from tempfile import TemporaryDirectory
 from threading import Event
-import shutil
 import json
 import re
 
@@ -11,14 +10,15 @@ from modules import filesystem
 from modules.deployments import RobloxVersion, LatestVersion, DeployHistory
 from modules.networking import requests, Response, Api
 
-from .utils import MaskStorage, locate_imagesets, locate_imagesetdata, ImageSetData, ImageSet, ImageSetIcon
-from .dataclasses import IconBlacklist, RemoteConfig, AdditionalFile, GradientColor
+from .utils import MaskStorage, IconBlacklistMatcher, locate_imagesets, locate_imagesetdata, ImageSetData, ImageSet, ImageSetIcon
+from .dataclasses import RemoteConfig, AdditionalFile, GradientColor
 from .exceptions import *
 
 from PIL import Image, PngImagePlugin  # type: ignore
 
 
 PREVIEW_DATA_DIR: Path = Path(__file__).parent / "preview_data"
+STAGING_PREFIX: str = ".mod_generator-"  # ModManager skips hidden entries, so a half-generated mod never shows up as a mod
 
 
 class ModGenerator:
@@ -176,8 +176,10 @@ class ModGenerator:
         if output_dir.exists():
             raise FileExistsError(str(output_dir))
 
-        Logger.info("Creating temporary directory...", prefix=cls._LOG_PREFIX)
-        with TemporaryDirectory() as tmp:
+        # Staging happens next to the output (same filesystem), so the finished mod can be renamed into place instead of copied
+        Logger.info("Creating staging directory...", prefix=cls._LOG_PREFIX)
+        output_dir.parent.mkdir(parents=True, exist_ok=True)
+        with TemporaryDirectory(dir=output_dir.parent, prefix=STAGING_PREFIX) as tmp:
             temporary_directory: Path = Path(tmp).resolve()
             temp_target: Path = temporary_directory / "mod"
             temp_target.mkdir(parents=True, exist_ok=True)
@@ -203,7 +205,10 @@ class ModGenerator:
             imagesetdata_path: Path = locate_imagesetdata(luapackages_target)
             imagesets_dir: Path = locate_imagesets(luapackages_target)
             temp_target_imageset_path: Path = temp_target / "ExtraContent" / "Luapackages" / imagesets_dir.relative_to(luapackages_target)
-            shutil.copytree(imagesets_dir, temp_target_imageset_path, dirs_exist_ok=True)
+            temp_target_imageset_path.parent.mkdir(parents=True, exist_ok=True)
+            imagesets_dir.rename(temp_target_imageset_path)  # luapackages is discarded afterwards, no need to copy
+            if imagesetdata_path.is_relative_to(imagesets_dir):
+                imagesetdata_path = temp_target_imageset_path / imagesetdata_path.relative_to(imagesets_dir)
 
             if stop_event is not None and stop_event.is_set():
                 Logger.info("Mod generator cancelled!", prefix=cls._LOG_PREFIX)
@@ -228,15 +233,22 @@ class ModGenerator:
                 Logger.info("Mod generator cancelled!", prefix=cls._LOG_PREFIX)
                 return False
 
+            blacklist_matcher: IconBlacklistMatcher = IconBlacklistMatcher.compile(remote_config.blacklist)
+            skip_masks: dict[str, tuple[bool, ...]] = blacklist_matcher.get_skip_masks(deployment.guid, image_set_data, icon_sizes=icon_sizes)
+
             Logger.info("Generating ImageSets...", prefix=cls._LOG_PREFIX)
             ROBLOX_LOGO_NAME: str = "icons/logo/block"
             for imageset in image_set_data.imagesets:
+                skip_mask: tuple[bool, ...] = skip_masks[imageset.name]
+                if all(skip_mask):  # Nothing to modify, no need to decode and re-encode the ImageSet
+                    continue
+
                 with Image.open(imageset.path, formats=("PNG",)) as imageset_image_object:
                     if imageset_image_object.mode != "RGBA":
                         imageset_image_object = imageset_image_object.convert("RGBA")
 
-                    for icon in imageset.icons:
-                        if cls._is_icon_blacklisted(icon.name, remote_config.blacklist):
+                    for icon, skip in zip(imageset.icons, skip_mask):
+                        if skip:
                             continue
 
                         if custom_roblox_icon is not None and icon.name == ROBLOX_LOGO_NAME:
@@ -289,23 +301,6 @@ class ModGenerator:
 
             if output_dir.exists():
                 raise FileExistsError(str(output_dir))
-            shutil.copytree(temp_target, output_dir, dirs_exist_ok=True)
+            temp_target.rename(output_dir)
             Logger.info("Mod generated successfully!", prefix=cls._LOG_PREFIX)
-            return True
-
-
-    @classmethod
-    def _is_icon_blacklisted(cls, name: str, blacklist: IconBlacklist) -> bool:
-        for prefix in blacklist.prefixes:
-            if name.startswith(prefix):
-                return True
-        for suffix in blacklist.suffixes:
-            if name.endswith(suffix):
-                return True
-        for keyword in blacklist.keywords:
-            if keyword in name:
-                return True
-        for strict in blacklist.strict:
-            if name == strict:
-                return True
-        return False
\ No newline at end of file
+            return True
\ No newline at end of file
@@ -1,2 +1,3 @@
 from .mask_storage import MaskStorage
-from .imagesets import ImageSetData, ImageSet, ImageSetIcon, locate_imagesets, locate_imagesetdata
\ No newline at end of file
+from .imagesets import ImageSetData, ImageSet, ImageSetIcon, locate_imagesets, locate_imagesetdata
+from .icon_blacklist import IconBlacklistMatcher
\ No newline at end of file
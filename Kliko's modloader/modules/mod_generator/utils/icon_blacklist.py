@@ -0,0 +1,163 @@
+from typing import Literal, Any
+import hashlib
+import json
+
+from ..dataclasses import IconBlacklist
+from .imagesets import ImageSetData
+
+
+_TERMINAL: str = ""  # Icon names never contain empty characters, safe to use as a trie marker
+
+
+def _cache_put(cache: dict, key: Any, value: Any, max_size: int) -> None:
+    """Dicts keep insertion order, so the first key is the least recently used one (get() moves hits to the end)"""
+
+    cache.pop(key, None)
+    cache[key] = value
+    while len(cache) > max_size:
+        del cache[next(iter(cache))]
+
+
+def _cache_get(cache: dict, key: Any) -> Any:
+    value: Any = cache.pop(key, None)
+    if value is not None: cache[key] = value
+    return value
+
+
+class _Trie:
+    """Prefix tree, used for prefix matching (and suffix matching on reversed strings)"""
+    _root: dict
+
+
+    def __init__(self, words: list[str]) -> None:
+        self._root = {}
+        for word in words:
+            node: dict = self._root
+            for char in word:
+                node = node.setdefault(char, {})
+            node[_TERMINAL] = True
+
+
+    def has_prefix_of(self, value: str) -> bool:
+        node: dict = self._root
+        if _TERMINAL in node: return True
+        for char in value:
+            next_node: dict | None = node.get(char)
+            if next_node is None: return False
+            if _TERMINAL in next_node: return True
+            node = next_node
+        return False
+
+
+class _KeywordAutomaton:
+    """Aho-Corasick automaton, matches all keywords in a single pass over the input"""
+    _goto: list[dict[str, int]]
+    _fail: list[int]
+    _output: list[bool]
+
+
+    def __init__(self, keywords: list[str]) -> None:
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [False]
+
+        for keyword in keywords:
+            state: int = 0
+            for char in keyword:
+                next_state: int | None = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(False)
+                    self._goto[state][char] = next_state
+                state = next_state
+            self._output[state] = True
+
+        queue: list[int] = list(self._goto[0].values())
+        for state in queue:
+            for char, next_state in self._goto[state].items():
+                fallback: int = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._output[next_state] = self._output[next_state] or self._output[self._fail[next_state]]
+                queue.append(next_state)
+
+
+    def search(self, value: str) -> bool:
+        goto: list[dict[str, int]] = self._goto
+        fail: list[int] = self._fail
+        output: list[bool] = self._output
+
+        if output[0]: return True
+        state: int = 0
+        for char in value:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]: return True
+        return False
+
+
+class IconBlacklistMatcher:
+    """Compiled version of an IconBlacklist, built once per blacklist version"""
+    version: str
+    _strict: frozenset[str]
+    _prefixes: _Trie
+    _suffixes: _Trie
+    _keywords: _KeywordAutomaton
+
+    _cache: dict[str, "IconBlacklistMatcher"] = {}
+    _skip_mask_cache: dict[tuple[str, str, int], dict[str, tuple[bool, ...]]] = {}
+    _MAX_CACHED_MATCHERS: int = 4  # Least recently used entries are evicted first
+    _MAX_CACHED_SKIP_MASKS: int = 8
+
+
+    def __init__(self, blacklist: IconBlacklist) -> None:
+        self.version = self.get_version(blacklist)
+        self._strict = frozenset(blacklist.strict)
+        self._prefixes = _Trie(blacklist.prefixes)
+        self._suffixes = _Trie([suffix[::-1] for suffix in blacklist.suffixes])
+        self._keywords = _KeywordAutomaton(blacklist.keywords)
+
+
+    @classmethod
+    def compile(cls, blacklist: IconBlacklist) -> "IconBlacklistMatcher":
+        version: str = cls.get_version(blacklist)
+        matcher: IconBlacklistMatcher | None = _cache_get(cls._cache, version)
+        if matcher is None:
+            matcher = cls(blacklist)
+            _cache_put(cls._cache, version, matcher, cls._MAX_CACHED_MATCHERS)
+        return matcher
+
+
+    @staticmethod
+    def get_version(blacklist: IconBlacklist) -> str:
+        data: list[list[str]] = [sorted(blacklist.prefixes), sorted(blacklist.suffixes), sorted(blacklist.keywords), sorted(blacklist.strict)]
+        return hashlib.sha1(json.dumps(data).encode()).hexdigest()
+
+
+    def matches(self, name: str) -> bool:
+        return (
+            name in self._strict
+            or self._prefixes.has_prefix_of(name)
+            or self._suffixes.has_prefix_of(name[::-1])
+            or self._keywords.search(name)
+        )
+
+
+    def get_skip_masks(self, deployment_guid: str, image_set_data: ImageSetData, icon_sizes: Literal[0, 1, 2, 3] = 0) -> dict[str, tuple[bool, ...]]:
+        """Returns a skip mask for each ImageSet, in the same order as ImageSet.icons. Results are memoized per (deployment, blacklist version, icon sizes)"""
+
+        cache_key: tuple[str, str, int] = (deployment_guid, self.version, icon_sizes)
+        cached_masks: dict[str, tuple[bool, ...]] | None = _cache_get(self._skip_mask_cache, cache_key)
+        if cached_masks is not None:
+            return cached_masks
+
+        skip_masks: dict[str, tuple[bool, ...]] = {
+            imageset.name: tuple(self.matches(icon.name) for icon in imageset.icons)
+            for imageset in image_set_data.imagesets
+        }
+        _cache_put(self._skip_mask_cache, cache_key, skip_masks, self._MAX_CACHED_SKIP_MASKS)
+        return skip_masks
\ No newline at end of file
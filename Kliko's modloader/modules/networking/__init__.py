@@ -4,9 +4,13 @@ Package responsible for handling HTTP requests and storing API endpoints.
 includes:
 - Api: A class that stores API endpoints.
 - requests: Responsible for handling HTTP requests.
+- RobloxMetadata: Responsible for looking up Roblox game and user metadata.
+- TokenBucket: Responsible for limiting how often something may happen.
 """
 
 from .api import Api
 from . import requests
 from .requests import Response, RequestException, ConnectionError, HTTPError
-from .cache import Cache
\ No newline at end of file
+from .cache import Cache
+from .metadata import RobloxMetadata, GameInfo, UserInfo
+from .rate_limit import TokenBucket
\ No newline at end of file
@@ -0,0 +1,269 @@
+"""Responsible for looking up Roblox game and user metadata, batching IDs where the endpoints accept lists."""
+
+from typing import Iterable, Iterator, Callable, Any, Optional
+from dataclasses import dataclass, asdict
+from threading import Thread, Lock
+from concurrent.futures import ThreadPoolExecutor
+
+from modules.logger import Logger
+
+from . import requests
+from .api import Api
+from .metadata_cache import MetadataCache, CachedValue
+
+
+@dataclass(frozen=True)
+class GameInfo:
+    universe_id: str
+    root_place_id: str
+    name: str
+    creator: str
+
+
+@dataclass(frozen=True)
+class UserInfo:
+    user_id: str
+    name: str
+    display_name: str
+
+
+class RobloxMetadata:
+    """
+    Responsible for looking up Roblox game and user metadata.
+    Results are cached on disk. Once a value is older than its TTL it is still returned, but refreshed in the background (stale-while-revalidate).
+    Values older than TTL + MAX_STALE are fetched again before returning.
+
+    Methods:
+        get_universe_id(place_id: str) -> str:
+            Returns the universe ID of the specified place.
+        get_games(universe_ids: Iterable[str]) -> dict[str, GameInfo]:
+            Returns information on the specified games, keyed by universe ID.
+        get_game_thumbnails(universe_ids: Iterable[str]) -> dict[str, str]:
+            Returns the thumbnail URLs of the specified games, keyed by universe ID.
+        get_user(user_id: str) -> UserInfo:
+            Returns information on the specified user.
+        get_user_thumbnails(user_ids: Iterable[str]) -> dict[str, str]:
+            Returns the thumbnail URLs of the specified users, keyed by user ID.
+        get_asset_thumbnails(asset_ids: Iterable[str]) -> dict[str, str]:
+            Returns the thumbnail URLs of the specified assets, keyed by asset ID.
+        configure(http: Any = None) -> None:
+            Send requests through another client.
+    """
+
+    CHUNK_SIZE: int = 50  # Maximum number of IDs per request
+    MAX_WORKERS: int = 4  # Maximum number of concurrent requests
+    TTL: dict[str, int] = {  # Seconds
+        "universe_id": 2678400,  # A place never moves to another universe
+        "game": 86400,
+        "game_thumbnail": 86400,
+        "user": 604800,
+        "user_thumbnail": 86400,
+        "asset_thumbnail": 86400
+    }
+    MAX_STALE: int = 604800
+
+    _http: Any = requests  # Anything with a compatible get(), see configure()
+    _revalidating: set[tuple[str, str]] = set()
+    _revalidating_lock: Lock = Lock()
+    _LOG_PREFIX: str = "RobloxMetadata"
+
+
+    @classmethod
+    def configure(cls, http: Any = None) -> None:
+        """
+        Send requests through another client, e.g. a local stand-in for the Roblox APIs.
+
+        Parameters:
+            http (Any): An object with a get() that is compatible with modules.networking.requests.get, the default client if None.
+        """
+
+        cls._http = requests if http is None else http
+
+
+    @classmethod
+    def _get_many(cls, kind: str, ids: Iterable[str], fetch: Callable[[list[str]], dict[str, Any]]) -> dict[str, Any]:
+        """fetch receives the IDs that need to be looked up and returns JSON-serializable values, keyed by ID"""
+
+        unique_ids: list[str] = list(dict.fromkeys(str(id) for id in ids))
+        if not unique_ids: return {}
+
+        ttl: int = cls.TTL[kind]
+        cached: dict[str, CachedValue] = MetadataCache.get_many(kind, unique_ids)
+        values: dict[str, Any] = {}
+        missing: list[str] = []
+        stale: list[str] = []
+        for id in unique_ids:
+            entry: CachedValue | None = cached.get(id)
+            if entry is None or entry.age > ttl + cls.MAX_STALE:
+                missing.append(id)
+                continue
+            values[id] = entry.value
+            if entry.age > ttl: stale.append(id)
+
+        if missing:
+            fetched: dict[str, Any] = fetch(missing)
+            MetadataCache.set_many(kind, fetched)
+            values.update(fetched)
+        if stale: cls._revalidate(kind, stale, fetch)
+        return values
+
+
+    @classmethod
+    def _revalidate(cls, kind: str, ids: list[str], fetch: Callable[[list[str]], dict[str, Any]]) -> None:
+        with cls._revalidating_lock:
+            ids = [id for id in ids if (kind, id) not in cls._revalidating]
+            if not ids: return
+            cls._revalidating.update((kind, id) for id in ids)
+
+        def worker() -> None:
+            try: MetadataCache.set_many(kind, fetch(ids))
+            except Exception as e: Logger.warning(f"Failed to refresh {kind} metadata! {type(e).__name__}: {e}", prefix=cls._LOG_PREFIX)
+            finally:
+                with cls._revalidating_lock: cls._revalidating.difference_update((kind, id) for id in ids)
+        Thread(target=worker, daemon=True).start()
+
+
+    @classmethod
+    def _chunks(cls, ids: Iterable[str]) -> Iterator[list[str]]:
+        unique_ids: list[str] = list(dict.fromkeys(str(id) for id in ids))
+        for i in range(0, len(unique_ids), cls.CHUNK_SIZE):
+            yield unique_ids[i:i + cls.CHUNK_SIZE]
+
+
+    @classmethod
+    def _get_chunked(cls, endpoint: Callable[[str], str], ids: list[str]) -> list[dict]:
+        """Requests the chunks concurrently and returns the items of all responses"""
+
+        def get_chunk(chunk: list[str]) -> list[dict]:
+            return cls._http.get(endpoint(",".join(chunk)), cache=False, ignore_cache=True).json()["data"]
+
+        chunks: list[list[str]] = list(cls._chunks(ids))
+        if len(chunks) <= 1: return [item for chunk in chunks for item in get_chunk(chunk)]
+        with ThreadPoolExecutor(max_workers=min(cls.MAX_WORKERS, len(chunks))) as executor:
+            return [item for items in executor.map(get_chunk, chunks) for item in items]
+
+
+    @classmethod
+    def get_universe_id(cls, place_id: str) -> Optional[str]:
+        """
+        Returns the universe ID of the specified place.
+
+        Parameters:
+            place_id (str): The ID of the Roblox place.
+
+        Returns:
+            Optional[str]: The ID of the universe the place belongs to, or None if the place doesn't exist.
+        """
+
+        return cls._get_many("universe_id", [place_id], cls._fetch_universe_ids).get(str(place_id))
+
+
+    @classmethod
+    def _fetch_universe_ids(cls, place_ids: list[str]) -> dict[str, str]:
+        universe_ids: dict[str, str] = {}
+        for place_id in place_ids:
+            universe_id: int | None = cls._http.get(Api.Roblox.Activity.universe_id(place_id), cache=False, ignore_cache=True).json()["universeId"]
+            if universe_id is not None: universe_ids[place_id] = str(universe_id)
+        return universe_ids
+
+
+    @classmethod
+    def get_games(cls, universe_ids: Iterable[str]) -> dict[str, GameInfo]:
+        """
+        Returns information on the specified games, unknown IDs are left out.
+
+        Parameters:
+            universe_ids (Iterable[str]): The IDs of the Roblox universes.
+
+        Returns:
+            dict[str, GameInfo]: Game information, keyed by universe ID.
+        """
+
+        return {universe_id: GameInfo(**value) for universe_id, value in cls._get_many("game", universe_ids, cls._fetch_games).items()}
+
+
+    @classmethod
+    def _fetch_games(cls, universe_ids: list[str]) -> dict[str, dict]:
+        games: dict[str, dict] = {}
+        for item in cls._get_chunked(Api.Roblox.Activity.game, universe_ids):
+            game: GameInfo = GameInfo(universe_id=str(item["id"]), root_place_id=str(item["rootPlaceId"]), name=item["name"], creator=item["creator"]["name"])
+            games[game.universe_id] = asdict(game)
+        return games
+
+
+    @classmethod
+    def get_game_thumbnails(cls, universe_ids: Iterable[str]) -> dict[str, str]:
+        """
+        Returns the thumbnail URLs of the specified games, unknown IDs are left out.
+
+        Parameters:
+            universe_ids (Iterable[str]): The IDs of the Roblox universes.
+
+        Returns:
+            dict[str, str]: Thumbnail URLs, keyed by universe ID.
+        """
+
+        return cls._get_many("game_thumbnail", universe_ids, lambda ids: cls._fetch_thumbnails(Api.Roblox.Activity.thumbnail, ids))
+
+
+    @classmethod
+    def get_user(cls, user_id: str) -> UserInfo:
+        """
+        Returns information on the specified user.
+
+        Parameters:
+            user_id (str): The ID of the Roblox user.
+
+        Returns:
+            UserInfo: The user's name and display name.
+        """
+
+        value: dict | None = cls._get_many("user", [user_id], cls._fetch_users).get(str(user_id))
+        if value is None: raise KeyError(f"User not found: {user_id}")
+        return UserInfo(**value)
+
+
+    @classmethod
+    def _fetch_users(cls, user_ids: list[str]) -> dict[str, dict]:
+        users: dict[str, dict] = {}
+        for user_id in user_ids:
+            data: dict = cls._http.get(Api.Roblox.Activity.user(user_id), cache=False, ignore_cache=True).json()
+            users[user_id] = asdict(UserInfo(user_id=user_id, name=data["name"], display_name=data.get("displayName", data["name"])))
+        return users
+
+
+    @classmethod
+    def get_user_thumbnails(cls, user_ids: Iterable[str]) -> dict[str, str]:
+        """
+        Returns the thumbnail URLs of the specified users, unknown IDs are left out.
+
+        Parameters:
+            user_ids (Iterable[str]): The IDs of the Roblox users.
+
+        Returns:
+            dict[str, str]: Thumbnail URLs, keyed by user ID.
+        """
+
+        return cls._get_many("user_thumbnail", user_ids, lambda ids: cls._fetch_thumbnails(Api.Roblox.Activity.user_thumbnail, ids))
+
+
+    @classmethod
+    def get_asset_thumbnails(cls, asset_ids: Iterable[str]) -> dict[str, str]:
+        """
+        Returns the thumbnail URLs of the specified assets, unknown IDs are left out.
+
+        Parameters:
+            asset_ids (Iterable[str]): The IDs of the Roblox assets.
+
+        Returns:
+            dict[str, str]: Thumbnail URLs, keyed by asset ID.
+        """
+
+        return cls._get_many("asset_thumbnail", asset_ids, lambda ids: cls._fetch_thumbnails(Api.Roblox.Activity.asset_thumbnail, ids))
+
+
+    @classmethod
+    def _fetch_thumbnails(cls, endpoint: Callable[[str], str], ids: list[str]) -> dict[str, str]:
+        """Only completed thumbnails are returned. Others (pending, blocked, ...) may have a placeholder URL, which must not be cached for the TTL"""
+
+        return {str(item["targetId"]): item["imageUrl"] for item in cls._get_chunked(endpoint, ids) if item.get("state") == "Completed" and item.get("imageUrl")}
\ No newline at end of file
@@ -0,0 +1,133 @@
+"""Responsible for storing Roblox metadata on disk, so it can be reused across sessions."""
+
+from typing import Any, Iterable, NamedTuple, Optional
+from pathlib import Path
+from threading import Lock
+import sqlite3
+import json
+import time
+
+from modules.logger import Logger
+from modules.filesystem import Directories
+
+
+class CachedValue(NamedTuple):
+    value: Any
+    age: float  # Seconds
+
+
+class MetadataCache:
+    """
+    Responsible for storing Roblox metadata on disk.
+    SQLite is used because the menu and the Activity Watcher run in separate processes and may write at the same time.
+    Any database error is logged and treated as a cache miss.
+
+    Methods:
+        get_many(kind: str, ids: Iterable[str]) -> dict[str, CachedValue]:
+            Retrieve cached values and their age.
+        set_many(kind: str, values: dict[str, Any]) -> None:
+            Store JSON-serializable values.
+        configure(filepath: Optional[Path] = None, in_memory: bool = False) -> None:
+            Use another database from now on.
+    """
+
+    DEFAULT_FILEPATH: Path = Directories.CACHE / "roblox_metadata.sqlite"
+    FILEPATH: Path = DEFAULT_FILEPATH
+    MAX_AGE: int = 2678400  # 31 days, older entries are removed
+
+    _connection: Optional[sqlite3.Connection] = None
+    _failed: bool = False
+    _in_memory: bool = False
+    _lock: Lock = Lock()
+
+    _MAX_PARAMETERS: int = 500
+    _LOG_PREFIX: str = "MetadataCache"
+
+
+    @classmethod
+    def _connect(cls) -> Optional[sqlite3.Connection]:
+        if cls._connection is not None or cls._failed: return cls._connection
+        try:
+            if not cls._in_memory: cls.FILEPATH.parent.mkdir(parents=True, exist_ok=True)
+            connection: sqlite3.Connection = sqlite3.connect(":memory:" if cls._in_memory else cls.FILEPATH, timeout=5, check_same_thread=False, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("CREATE TABLE IF NOT EXISTS metadata (kind TEXT NOT NULL, id TEXT NOT NULL, value TEXT NOT NULL, updated REAL NOT NULL, PRIMARY KEY (kind, id)) WITHOUT ROWID")
+            connection.execute("DELETE FROM metadata WHERE updated < ?", (time.time() - cls.MAX_AGE,))
+            cls._connection = connection
+        except (sqlite3.Error, OSError) as e:
+            Logger.warning(f"Metadata cache unavailable! {type(e).__name__}: {e}", prefix=cls._LOG_PREFIX)
+            cls._failed = True
+        return cls._connection
+
+
+    @classmethod
+    def configure(cls, filepath: Optional[Path] = None, in_memory: bool = False) -> None:
+        """
+        Closes the current connection, later calls use the given database.
+
+        Parameters:
+            filepath (Optional[Path]): The database file, DEFAULT_FILEPATH if None.
+            in_memory (bool): Keep the cache in memory instead, it is lost once the connection is closed.
+        """
+
+        with cls._lock:
+            if cls._connection is not None: cls._connection.close()
+            cls._connection = None
+            cls._failed = False
+            cls.FILEPATH = filepath or cls.DEFAULT_FILEPATH
+            cls._in_memory = in_memory
+
+
+    @classmethod
+    def get_many(cls, kind: str, ids: Iterable[str]) -> dict[str, CachedValue]:
+        """
+        Retrieve cached values and their age, missing IDs are left out.
+
+        Parameters:
+            kind (str): The kind of metadata, for example "game".
+            ids (Iterable[str]): The IDs to look up.
+
+        Returns:
+            dict[str, CachedValue]: The cached values, keyed by ID.
+        """
+
+        ids = list(ids)
+        values: dict[str, CachedValue] = {}
+        now: float = time.time()
+        with cls._lock:
+            connection: Optional[sqlite3.Connection] = cls._connect()
+            if connection is None: return values
+            try:
+                for i in range(0, len(ids), cls._MAX_PARAMETERS):
+                    chunk: list[str] = ids[i:i + cls._MAX_PARAMETERS]
+                    placeholders: str = ",".join("?" * len(chunk))
+                    query: str = f"SELECT id, value, updated FROM metadata WHERE kind = ? AND id IN ({placeholders})"
+                    for id, value, updated in connection.execute(query, (kind, *chunk)):
+                        values[id] = CachedValue(json.loads(value), now - updated)
+            except (sqlite3.Error, ValueError) as e:
+                Logger.warning(f"Failed to read metadata cache! {type(e).__name__}: {e}", prefix=cls._LOG_PREFIX)
+        return values
+
+
+    @classmethod
+    def set_many(cls, kind: str, values: dict[str, Any]) -> None:
+        """
+        Store JSON-serializable values.
+
+        Parameters:
+            kind (str): The kind of metadata, for example "game".
+            values (dict[str, Any]): The values to store, keyed by ID.
+        """
+
+        if not values: return
+        now: float = time.time()
+        rows: list[tuple[str, str, str, float]] = [(kind, id, json.dumps(value), now) for id, value in values.items()]
+        with cls._lock:
+            connection: Optional[sqlite3.Connection] = cls._connect()
+            if connection is None: return
+            try:
+                with connection:
+                    connection.execute("BEGIN")
+                    connection.executemany("INSERT OR REPLACE INTO metadata (kind, id, value, updated) VALUES (?, ?, ?, ?)", rows)
+            except sqlite3.Error as e:
+                Logger.warning(f"Failed to write metadata cache! {type(e).__name__}: {e}", prefix=cls._LOG_PREFIX)
\ No newline at end of file
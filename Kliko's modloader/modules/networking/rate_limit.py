@@ -0,0 +1,68 @@
+"""Responsible for limiting how often something may happen."""
+
+from typing import Optional
+from threading import Lock
+import time
+
+
+class TokenBucket:
+    """
+    Allows bursts of up to `capacity` actions, refilled at `rate` tokens per second.
+
+    Methods:
+        try_acquire() -> bool:
+            Take a token if one is available.
+        acquire(timeout: Optional[float] = None) -> bool:
+            Wait until a token is available and take it.
+        time_until_available() -> float:
+            Seconds until the next token is available.
+    """
+
+    rate: float
+    capacity: float
+
+    _tokens: float
+    _updated: float
+    _lock: Lock
+
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = Lock()
+
+
+    def _refill(self) -> None:
+        now: float = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            self._refill()
+            if self._tokens < 1: return False
+            self._tokens -= 1
+            return True
+
+
+    def time_until_available(self) -> float:
+        with self._lock:
+            self._refill()
+            return max(0, (1 - self._tokens) / self.rate)
+
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """Returns False if no token became available within the timeout"""
+
+        deadline: float | None = None if timeout is None else time.monotonic() + timeout
+        while True:
+            if self.try_acquire(): return True
+            wait: float = self.time_until_available()
+            if deadline is not None:
+                remaining: float = deadline - time.monotonic()
+                if remaining <= 0: return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
\ No newline at end of file